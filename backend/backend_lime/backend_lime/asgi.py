@@ -1,5 +1,5 @@
 """
-ASGI config for backend_django project.
+ASGI config for backend_lime project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
@@ -11,6 +11,6 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_django.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_lime.settings')
 
 application = get_asgi_application()
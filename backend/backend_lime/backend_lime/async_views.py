@@ -0,0 +1,94 @@
+"""
+Vistas asíncronas de solo lectura, para servir con ASGI (``uvicorn
+backend_lime.asgi:application``).
+
+Con ASGI cada vista síncrona ocupa un hilo mientras espera a la base de datos;
+estas vistas no. Reutilizan la configuración de una vista de DRF
+(``drf_view_class``): autenticación, permisos, negociación de contenido,
+manejo de errores y renderizado, que siguen siendo síncronos y corren con
+``sync_to_async``. Las consultas de los datos usan el ORM asíncrono.
+
+Las rutas síncronas no cambian; estas se publican bajo ``/api/async/``.
+"""
+from abc import ABC, abstractmethod
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.views import View
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSetMixin
+from .conditional import ConditionalGetMixin, not_modified
+
+
+class AsyncDRFView(ABC, View):
+    """
+    Base: prepara una instancia de ``drf_view_class`` como lo haría su
+    ``dispatch`` y delega en ``handle`` (async) la respuesta.
+    """
+    drf_view_class = None
+    http_method_names = ['get', 'head']
+
+    def get_action(self, **kwargs):
+        return None
+
+    async def get(self, request, *args, **kwargs):
+        view = self.drf_view_class()
+        view.args, view.kwargs = args, kwargs
+        if isinstance(view, ViewSetMixin):
+            view.action_map = {'get': self.get_action(**kwargs), 'head': self.get_action(**kwargs)}
+        view.request = drf_request = view.initialize_request(request, *args, **kwargs)
+        view.headers = view.default_response_headers
+        try:
+            # Autenticación (puede consultar el usuario), permisos y throttling
+            await sync_to_async(view.initial)(drf_request, *args, **kwargs)
+            response = await self.handle(view, drf_request, *args, **kwargs)
+        except Exception as exc:
+            response = view.handle_exception(exc)
+        return view.finalize_response(drf_request, response, *args, **kwargs)
+
+    @abstractmethod
+    async def handle(self, view, request, *args, **kwargs):
+        """Respuesta (``Response``) de la petición ya autenticada y autorizada."""
+
+
+class AsyncReadOnlyView(AsyncDRFView):
+    """
+    ``list`` y ``retrieve`` de un ModelViewSet: mismo queryset, filtros,
+    paginación, serializador y ETag (``ConditionalGetMixin``). El queryset
+    debe traer con ``select_related`` lo que el serializador lea de las
+    relaciones: en un contexto async una consulta perezosa falla.
+    """
+
+    def get_action(self, **kwargs):
+        return 'retrieve' if 'pk' in kwargs else 'list'
+
+    async def handle(self, view, request, *args, **kwargs):
+        if not isinstance(view, ConditionalGetMixin):
+            return await getattr(self, view.action)(view, request)
+        etag = await sync_to_async(view.get_etag)(request)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        response = await getattr(self, view.action)(view, request)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    async def list(self, view, request):
+        queryset = view.filter_queryset(view.get_queryset())
+        # paginate_queryset evalúa la página (y el conteo) con el ORM síncrono
+        page = await sync_to_async(view.paginate_queryset)(queryset)
+        if page is not None:
+            return view.get_paginated_response(view.get_serializer(page, many=True).data)
+        objects = [obj async for obj in queryset]
+        return Response(view.get_serializer(objects, many=True).data)
+
+    async def retrieve(self, view, request):
+        queryset = view.filter_queryset(view.get_queryset())
+        lookup = view.lookup_url_kwarg or view.lookup_field
+        try:
+            obj = await queryset.aget(**{view.lookup_field: view.kwargs[lookup]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError):
+            raise Http404
+        view.check_object_permissions(request, obj)
+        return Response(view.get_serializer(obj).data)
@@ -0,0 +1,69 @@
+"""
+``/api/bootstrap/``: la carga inicial del tablero en una sola petición.
+
+Trae sedes, servicios, responsables y la primera página del listado compacto
+de equipos (``?page_size=`` como en ``/api/equipos/``). El ETag combina el
+validador de la tabla de equipos con las versiones de las tablas de referencia
+(ver reference_cache), así que revalidar cuesta una consulta; la respuesta
+armada se guarda en la caché de referencia con ese ETag como clave.
+"""
+from django.core.cache import caches
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from equipos.models import Equipos
+from equipos.pagination import BootstrapEquiposPagination
+from equipos.serializers import EquiposListSerializer
+from responsables.models import Responsable
+from responsables.serializers import ResponsablesSerializer
+from sedes.models import Sede
+from sedes.serializers import SedesSerializer
+from servicios.models import Servicio
+from servicios.serializers import ServiciosSerializer
+from .conditional import make_etag, not_modified, table_state
+from .reference_cache import CACHE_ALIAS, KEY_PREFIX, get_version
+
+REFERENCE_TABLES = (
+    ('sites', Sede, SedesSerializer),
+    ('services', Servicio, ServiciosSerializer),
+    ('responsibles', Responsable, ResponsablesSerializer),
+)
+
+
+def _bootstrap_data(request):
+    data = {
+        key: serializer(model.objects.all(), many=True).data
+        for key, model, serializer in REFERENCE_TABLES
+    }
+    columns = [f for f in EquiposListSerializer.Meta.fields if f != 'display']
+    paginator = BootstrapEquiposPagination()
+    page = paginator.paginate_queryset(Equipos.objects.only(*columns), request)
+    data['equipos'] = {
+        'next': paginator.get_next_link(),
+        'results': EquiposListSerializer(page, many=True, context={'request': request}).data,
+    }
+    return data
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def bootstrap(request):
+    """Tablas de referencia y primera página de equipos (compacta)."""
+    etag = make_etag(
+        request,
+        table_state(Equipos.objects.all(), 'updated_at'),
+        *(get_version(model) for _, model, _ in REFERENCE_TABLES),
+    )
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    key = f'{KEY_PREFIX}:bootstrap:{etag}'
+    data = caches[CACHE_ALIAS].get(key)
+    if data is None:
+        data = _bootstrap_data(request)
+        caches[CACHE_ALIAS].set(key, data)
+    response = Response(data)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
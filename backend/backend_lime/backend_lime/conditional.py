@@ -0,0 +1,74 @@
+"""
+GET condicional (ETag / If-None-Match) para las vistas del API.
+
+El ETag se calcula con un validador barato de la tabla (no con la respuesta
+serializada), así que una colección sin cambios responde ``304 Not Modified``
+sin consultar ni serializar las filas.
+"""
+import hashlib
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+
+def table_state(queryset, updated_field=None):
+    """
+    Validador de una tabla. Con ``updated_field`` (un DateTimeField con
+    auto_now indexado) es una sola agregación: cantidad de filas, id máximo y
+    última modificación. Sin él se usa el contenido de la tabla, pensado solo
+    para las tablas de referencia pequeñas.
+    """
+    if updated_field:
+        return tuple(queryset.aggregate(
+            count=Count('pk'), last_id=Max('pk'), last_update=Max(updated_field),
+        ).values())
+    return list(queryset.order_by('pk').values_list())
+
+
+def make_etag(request, *parts):
+    """
+    ETag débil a partir del validador, de la URL pedida (filtros incluidos) y
+    del formato de la respuesta.
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    key = (request.get_full_path(), getattr(renderer, 'format', None), *parts)
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()
+    return 'W/' + quote_etag(digest)
+
+
+def not_modified(request, etag):
+    """Respuesta 304 si el cliente ya tiene esa versión, o None."""
+    django_request = getattr(request, '_request', request)
+    response = get_conditional_response(django_request, etag=etag)
+    if response is not None:
+        response['ETag'] = etag
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Agrega ETag a ``list`` y ``retrieve`` de un ViewSet. Las subclases pueden
+    definir ``etag_updated_field`` para usar el validador por agregación.
+    """
+    etag_updated_field = None
+
+    def get_etag(self, request):
+        state = table_state(self.queryset.model._default_manager.all(), self.etag_updated_field)
+        return make_etag(request, state)
+
+    def _conditional(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,139 @@
+"""
+Caché de respuestas para las tablas de referencia (sedes, servicios,
+responsables).
+
+El backend se elige con ``REFERENCE_CACHE_BACKEND`` (ver settings): archivos,
+un servidor compatible con Redis o memoria local (un solo proceso). Cada
+modelo tiene una versión en la misma caché; guardar o borrar una fila la cambia (ver
+``invalidate``) y las entradas anteriores quedan inalcanzables. El ETag se
+deriva de esa versión, así que un listado repetido, o un 304, se responde sin
+consultar la base de datos.
+"""
+import uuid
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.mixins import ListModelMixin
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from responsables.models import Responsable
+from sedes.models import Sede
+from servicios.models import Servicio
+from users.permissions import IsAdmin
+from .async_views import AsyncReadOnlyView
+from .conditional import ConditionalGetMixin, make_etag
+
+CACHE_ALIAS = 'reference'
+KEY_PREFIX = 'reference'
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _label(model):
+    return model._meta.label_lower
+
+
+# La versión expira con el timeout de la caché, como los listados: si algún
+# proceso no ve una invalidación (p. ej. con locmem), sirve la versión vieja
+# a lo sumo ese tiempo, no indefinidamente.
+def get_version(model):
+    """Versión vigente de la tabla; se crea una nueva si la caché la perdió o expiró."""
+    return _cache().get_or_set(f'{KEY_PREFIX}:version:{_label(model)}', lambda: uuid.uuid4().hex)
+
+
+def invalidate(model):
+    """Descarta las respuestas en caché de ``model``."""
+    _cache().set(f'{KEY_PREFIX}:version:{_label(model)}', uuid.uuid4().hex)
+
+
+def _count(model, outcome):
+    cache = _cache()
+    key = f'{KEY_PREFIX}:{outcome}:{_label(model)}'
+    # add() no pisa un contador existente; incr() es atómico en Redis.
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # La entrada se desalojó entre add() e incr(): se pierde una muestra.
+        pass
+
+
+def get_stats(models):
+    """Aciertos, fallos y tasa de aciertos por modelo."""
+    cache = _cache()
+    stats = {}
+    for model in models:
+        hits = cache.get(f'{KEY_PREFIX}:hits:{_label(model)}', 0)
+        misses = cache.get(f'{KEY_PREFIX}:misses:{_label(model)}', 0)
+        total = hits + misses
+        stats[_label(model)] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else None,
+        }
+    return stats
+
+
+class ReferenceCacheMixin(ConditionalGetMixin):
+    """
+    Cachea ``list`` de un ViewSet de referencia. El ETag usa la versión de la
+    tabla en lugar de consultarla; ``list`` guarda los datos serializados por
+    ETag (URL, formato y versión).
+    """
+
+    def get_etag(self, request):
+        return make_etag(request, get_version(self.queryset.model))
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(self._cached_list, request, *args, **kwargs)
+
+    def list_cache_key(self, request):
+        return f'{KEY_PREFIX}:list:{_label(self.queryset.model)}:{self.get_etag(request)}'
+
+    def _cached_list(self, request, *args, **kwargs):
+        model = self.queryset.model
+        key = self.list_cache_key(request)
+        data = _cache().get(key)
+        if data is not None:
+            _count(model, 'hits')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        _count(model, 'misses')
+        response = ListModelMixin.list(self, request, *args, **kwargs)
+        _cache().set(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class AsyncReferenceView(AsyncReadOnlyView):
+    """Versión async (ver backend_lime.async_views) del listado en caché."""
+
+    async def list(self, view, request):
+        model = view.queryset.model
+        key = await sync_to_async(view.list_cache_key)(request)
+        data = await _cache().aget(key)
+        if data is not None:
+            await sync_to_async(_count)(model, 'hits')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        await sync_to_async(_count)(model, 'misses')
+        response = await super().list(view, request)
+        await _cache().aset(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def reference_cache_stats(request):
+    """Métricas de la caché de las tablas de referencia."""
+    return Response({
+        'backend': _cache().__class__.__name__,
+        'models': get_stats([Sede, Servicio, Responsable]),
+    })
@@ -0,0 +1,63 @@
+"""
+Renderer y parser JSON del API.
+
+Usan orjson cuando está instalado y, si no, los de DRF (``json`` de la
+biblioteca estándar). Ocupan el lugar de ``JSONRenderer`` / ``JSONParser``
+(mismo media type ``application/json`` y formato ``json``), así que la
+negociación por ``Accept`` / ``Content-Type`` y ``?format=json`` no cambian.
+
+La salida es la misma que la de DRF: las fechas, los Decimal y demás tipos
+que orjson no trata igual pasan por el ``JSONEncoder`` de DRF.
+"""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # Las fechas se delegan al encoder de DRF (milisegundos, 'Z' para UTC)
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        # orjson solo produce la forma compacta, UTF-8 y sin NaN: con
+        # indentación (p. ej. "application/json; indent=4") u otras opciones
+        # de DRF, o sin orjson, renderiza DRF.
+        if (
+            orjson is None or data is None
+            or not self.compact or self.ensure_ascii or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=JSONEncoder().default, option=ORJSON_OPTIONS)
+        # Igual que DRF: U+2028/U+2029 escapados para poder incrustar en JavaScript
+        if b'\xe2\x80' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                body = body.decode(encoding)
+            # orjson rechaza NaN e Infinity, como STRICT_JSON
+            return orjson.loads(body)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,128 @@
+"""
+Réplicas de lectura.
+
+``ReplicaRoutingMiddleware`` marca las peticiones GET/HEAD/OPTIONS como de
+solo lectura y ``ReplicaRouter`` manda sus consultas a una de las réplicas de
+``DATABASE_REPLICAS``; las escrituras, y todo lo que ocurre fuera de una
+petición de lectura (comandos, señales de escritura), usan el primario.
+
+Después de una escritura exitosa el usuario queda fijado al primario por
+``REPLICA_PIN_SECONDS`` segundos, para que vea su propio cambio aunque la
+réplica aún no lo tenga. La marca se guarda por usuario del JWT en la caché
+``PIN_CACHE`` (Redis, o locmem por proceso; nunca la base de datos, que
+costaría una consulta al primario en cada lectura); el frontend es de otro
+origen y no devuelve cookies. Los clientes sin JWT (admin, API navegable)
+reciben la cookie ``PIN_COOKIE`` y no consultan la caché.
+"""
+import random
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+PIN_CACHE = 'replica_pins'
+PIN_KEY = 'user:{}'
+PIN_COOKIE = 'replica_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_only = ContextVar('read_only', default=False)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        # Las cachés en base de datos (lista de bloqueo, roles) no toleran retraso
+        if replicas and _read_only.get() and model._meta.app_label != 'django_cache':
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Explícito: sin router Django escribiría en la base de la que se leyó la instancia
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas se migran por replicación
+        return db not in settings.DATABASE_REPLICAS
+
+
+def _pin_key(request):
+    """Clave de fijación del usuario del JWT de la petición; None si no trae uno válido."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    try:
+        raw_token = authentication.get_raw_token(header) if header else None
+        # Solo se verifica la firma (sin consultas); la vista autentica como siempre
+        token = authentication.get_validated_token(raw_token) if raw_token else None
+    except AuthenticationFailed:
+        return None
+    return PIN_KEY.format(token[api_settings.USER_ID_CLAIM]) if token else None
+
+
+class ReplicaRoutingMiddleware:
+    # Sin adaptación a hilos bajo ASGI (ver backend_lime.async_views)
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        key = _pin_key(request) if settings.DATABASE_REPLICAS else None
+        pinned = PIN_COOKIE in request.COOKIES or (
+            key is not None and request.method in SAFE_METHODS and caches[PIN_CACHE].get(key) is not None
+        )
+        token = _read_only.set(request.method in SAFE_METHODS and not pinned)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_only.reset(token)
+        if self._wrote(request, response):
+            if key is None:
+                self._set_cookie(response)
+            else:
+                caches[PIN_CACHE].set(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        key = _pin_key(request) if settings.DATABASE_REPLICAS else None
+        pinned = PIN_COOKIE in request.COOKIES or (
+            key is not None and request.method in SAFE_METHODS and await caches[PIN_CACHE].aget(key) is not None
+        )
+        token = _read_only.set(request.method in SAFE_METHODS and not pinned)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_only.reset(token)
+        if self._wrote(request, response):
+            if key is None:
+                self._set_cookie(response)
+            else:
+                await caches[PIN_CACHE].aset(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    def _wrote(self, request, response):
+        # Una escritura rechazada (4xx/5xx) no cambió nada que haya que leer del primario
+        return (
+            bool(settings.DATABASE_REPLICAS) and request.method not in SAFE_METHODS
+            and 200 <= response.status_code < 300
+        )
+
+    def _set_cookie(self, response):
+        response.set_cookie(
+            PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+        )
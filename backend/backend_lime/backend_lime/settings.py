@@ -10,7 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
+import tempfile
+import warnings
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -48,6 +52,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'backend_lime.replicas.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -83,11 +88,151 @@ WSGI_APPLICATION = 'backend_lime.wsgi.application'
 # =======================
 #  Base de datos
 # =======================
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=postgresql usa PostgreSQL (DB_NAME, DB_USER, DB_PASSWORD, DB_HOST,
+# DB_PORT; requiere psycopg). Por defecto, SQLite; con DB_SQLITE_WAL=1 en modo
+# WAL: los lectores no esperan a las escrituras y solo las escrituras se
+# serializan. WAL queda guardado en el archivo de la base (y deja los archivos
+# -wal y -shm a su lado), por eso no se activa sin pedirlo.
+# DB_CONN_MAX_AGE: segundos que cada proceso conserva su conexión entre
+# peticiones (0 = una por petición). Django 4.2 no trae un pool propio; para
+# compartir conexiones entre procesos se apunta DB_HOST/DB_PORT a PgBouncer
+# con DB_PGBOUNCER=1.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'backend_lime'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', ''),
+            'PORT': os.environ.get('DB_PORT', ''),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            # Descarta conexiones persistentes caídas antes de usarlas
+            'CONN_HEALTH_CHECKS': True,
+            # PgBouncer en modo transaction no admite cursores del servidor
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_PGBOUNCER', '').lower() in ('1', 'true', 'yes'),
+        }
+    }
+    # Réplicas de lectura: DB_REPLICA_HOSTS=host1,host2:5433 (mismas credenciales)
+    for _number, _replica in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), 1):
+        _host, _, _port = _replica.strip().partition(':')
+        DATABASES[f'replica{_number}'] = {
+            **DATABASES['default'],
+            'HOST': _host,
+            'PORT': _port or DATABASES['default']['PORT'],
+            'TEST': {'MIRROR': 'default'},
+        }
+elif DB_ENGINE == 'sqlite':
+    DB_SQLITE_WAL = os.environ.get('DB_SQLITE_WAL', '').lower() in ('1', 'true', 'yes')
+    DATABASES = {
+        'default': {
+            # Igual a django.db.backends.sqlite3, pero aplica init_command
+            'ENGINE': 'backend_lime.sqlite',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'OPTIONS': {
+                # synchronous=NORMAL es seguro con WAL (solo arriesga la última
+                # transacción ante un corte de energía); mmap de 256 MB.
+                'init_command': (
+                    ('PRAGMA journal_mode=WAL;' if DB_SQLITE_WAL else '')
+                    + 'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA mmap_size=268435456;'
+                    'PRAGMA busy_timeout=5000;'
+                ),
+            },
+        }
     }
+else:
+    raise ImproperlyConfigured(f'DB_ENGINE inválido: {DB_ENGINE!r} (use sqlite o postgresql)')
+
+# Las peticiones de lectura van a las réplicas (ver backend_lime.replicas); tras
+# escribir, el cliente lee del primario durante REPLICA_PIN_SECONDS segundos.
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['backend_lime.replicas.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+
+# Margen con el que /api/equipos/changes/ devuelve su cursor: debe superar la
+# transacción de escritura más larga y el retraso de las réplicas.
+SYNC_CURSOR_OVERLAP_SECONDS = int(os.environ.get('SYNC_CURSOR_OVERLAP_SECONDS', 60))
+
+
+# =======================
+#  Caché
+# =======================
+# 'reference' guarda los listados de sedes, servicios y responsables y la
+# versión de cada tabla, que cambia al escribir en ella. Todos los procesos
+# deben ver la misma versión. REFERENCE_CACHE_BACKEND: file (por defecto;
+# procesos de la misma máquina), redis (varias máquinas; requiere redis-py) o
+# locmem (un solo proceso: con varios, un cambio solo invalidaría la caché del
+# proceso que lo atendió).
+REFERENCE_CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'reference'),
+    'file': (
+        'django.core.cache.backends.filebased.FileBasedCache',
+        os.path.join(tempfile.gettempdir(), 'backend_lime', 'reference'),
+    ),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+REFERENCE_CACHE_BACKEND = os.environ.get('REFERENCE_CACHE_BACKEND', 'file')
+if REFERENCE_CACHE_BACKEND == 'locmem' and int(os.environ.get('WEB_CONCURRENCY', 1)) > 1:
+    raise ImproperlyConfigured('REFERENCE_CACHE_BACKEND=locmem no admite varios procesos (WEB_CONCURRENCY > 1)')
+_reference_backend, _reference_location = REFERENCE_CACHE_BACKENDS[REFERENCE_CACHE_BACKEND]
+
+# Cachés compartidas por todos los procesos, que sobreviven a un reinicio (no
+# admiten locmem): 'tokens' guarda la lista de bloqueo de JWT
+# (users.authentication) y 'roles' el rol de cada usuario (users.permissions).
+# SHARED_CACHE_BACKEND: database (por defecto; las tablas las crea migrate) o
+# redis (SHARED_CACHE_REDIS_URL).
+SHARED_CACHE_BACKEND = os.environ.get('SHARED_CACHE_BACKEND', 'database')
+if SHARED_CACHE_BACKEND not in ('database', 'redis'):
+    raise ImproperlyConfigured(f'SHARED_CACHE_BACKEND inválido: {SHARED_CACHE_BACKEND!r} (use database o redis)')
+
+
+def _shared_cache(name):
+    if SHARED_CACHE_BACKEND == 'redis':
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('SHARED_CACHE_REDIS_URL', 'redis://127.0.0.1:6379/2'),
+            'KEY_PREFIX': name,
+        }
+    return {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': f'cache_{name}',
+        # Cada entrada expira sola; no se descartan entradas vigentes por
+        # espacio (una revocación descartada volvería a valer).
+        'OPTIONS': {'MAX_ENTRIES': 10 ** 9},
+    }
+
+
+# 'replica_pins' guarda los usuarios que acaban de escribir
+# (backend_lime.replicas) y se consulta en cada lectura: en la base de datos
+# costaría una consulta al primario por petición. Sin Redis se usa locmem, por
+# proceso: otro proceso puede atender la lectura siguiente desde la réplica.
+if SHARED_CACHE_BACKEND == 'redis':
+    _pin_cache = _shared_cache('replica_pins')
+else:
+    if DATABASE_REPLICAS:
+        warnings.warn(
+            'Réplicas sin SHARED_CACHE_BACKEND=redis: las fijaciones al primario son por proceso',
+            RuntimeWarning,
+        )
+    _pin_cache = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'replica_pins'}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'tokens': _shared_cache('tokens'),
+    'roles': _shared_cache('roles'),
+    'replica_pins': _pin_cache,
+    'reference': {
+        'BACKEND': _reference_backend,
+        'LOCATION': os.environ.get('REFERENCE_CACHE_LOCATION', _reference_location),
+        'TIMEOUT': int(os.environ.get('REFERENCE_CACHE_TIMEOUT', 3600)),
+    },
 }
 
 
@@ -136,13 +281,33 @@ CORS_ALLOW_ALL_ORIGINS = True  # Only for development
 CORS_ALLOW_CREDENTIALS = True
  
 # Django REST Framework + Simple JWT configuration
+# Con JWT_STATELESS_AUTH=1 el usuario se construye con los claims del token
+# (user_id, username, role) sin consultar el usuario en cada petición.
+# Requiere SHARED_CACHE_BACKEND=redis: con la caché en la base de datos, la
+# consulta de la lista de bloqueo seguiría costando una consulta por petición.
+JWT_STATELESS_AUTH = os.environ.get('JWT_STATELESS_AUTH', '').lower() in ('1', 'true', 'yes')
+if JWT_STATELESS_AUTH and SHARED_CACHE_BACKEND == 'database':
+    raise ImproperlyConfigured('JWT_STATELESS_AUTH requiere SHARED_CACHE_BACKEND=redis')
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.StatelessJWTAuthentication'
+        if JWT_STATELESS_AUTH else
+        'users.authentication.RevocableJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # JSON con orjson si está instalado (ver backend_lime.renderers)
+    'DEFAULT_RENDERER_CLASSES': (
+        'backend_lime.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'backend_lime.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 from datetime import timedelta
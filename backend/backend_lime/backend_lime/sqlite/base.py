@@ -0,0 +1,22 @@
+"""
+Backend SQLite que ejecuta ``OPTIONS['init_command']`` en cada conexión nueva
+(PRAGMA synchronous, mmap, busy_timeout y, con DB_SQLITE_WAL, WAL; ver
+settings), como lo hace el backend de Django 5.1. Con esa versión puede volver a usarse
+``django.db.backends.sqlite3`` sin cambiar la configuración.
+"""
+from django.db.backends.sqlite3 import base
+from django.utils.asyncio import async_unsafe
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        # init_command no es un argumento de sqlite3.connect()
+        conn_params = dict(conn_params)
+        init_command = conn_params.pop('init_command', '')
+        conn = super().get_new_connection(conn_params)
+        for sql in init_command.split(';'):
+            if sql.strip():
+                conn.execute(sql)
+        return conn
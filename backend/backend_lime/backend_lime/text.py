@@ -0,0 +1,42 @@
+"""
+Normalización de texto para búsquedas.
+
+``search_key`` es la forma que se guarda en las columnas ``*_key`` (con
+índice): sin tildes, en minúsculas y con los espacios normalizados, de modo
+que "Calibración", "CALIBRACION " y "calibracion" comparten clave.
+"""
+import re
+import unicodedata
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def search_key(value, max_length=None):
+    """Clave de búsqueda de ``value`` ('' si está vacío)."""
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(value))
+    folded = ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+    key = ' '.join(folded.split())
+    return key[:max_length] if max_length else key
+
+
+def trigrams(key):
+    """Trigramas de cada palabra con el mismo relleno que pg_trgm ('  c', ' ca', ..., 'on ')."""
+    grams = set()
+    for word in _WORD_RE.findall(key):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def word_similarity(query, key):
+    """
+    Fracción de los trigramas de ``query`` presentes en ``key``; equivale a
+    ``word_similarity`` de pg_trgm para comparar una palabra con un texto
+    largo.
+    """
+    query_grams = trigrams(query)
+    if not query_grams:
+        return 0.0
+    return len(query_grams & trigrams(key)) / len(query_grams)
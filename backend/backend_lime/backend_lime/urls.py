@@ -2,11 +2,14 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework import routers
+from equipos.async_views import MaintenanceEventsAsyncView
 from equipos.views import EquiposViewSet
 from responsables.views import ResponsablesViewSet
 from sedes.views import SedesViewSet
 from servicios.views import ServiciosViewSet
-from rest_framework_simplejwt.views import TokenRefreshView
+from .async_views import AsyncReadOnlyView
+from .bootstrap import bootstrap
+from .reference_cache import AsyncReferenceView, reference_cache_stats
 
 # Crear el router principal
 router = routers.DefaultRouter()
@@ -15,15 +18,30 @@ router.register(r'responsables', ResponsablesViewSet)
 router.register(r'sedes', SedesViewSet)
 router.register(r'servicios', ServiciosViewSet)
 
+# Versiones async (ASGI) de las lecturas del tablero, ver backend_lime.async_views
+async_urlpatterns = [
+    path('equipos/', AsyncReadOnlyView.as_view(drf_view_class=EquiposViewSet)),
+    path('equipos/<int:pk>/', AsyncReadOnlyView.as_view(drf_view_class=EquiposViewSet)),
+    path('equipos/maintenance-events/', MaintenanceEventsAsyncView.as_view()),
+]
+for prefix, viewset in (('responsables', ResponsablesViewSet), ('sedes', SedesViewSet), ('servicios', ServiciosViewSet)):
+    async_urlpatterns += [
+        path(f'{prefix}/', AsyncReferenceView.as_view(drf_view_class=viewset)),
+        path(f'{prefix}/<int:pk>/', AsyncReferenceView.as_view(drf_view_class=viewset)),
+    ]
+
 # URLs de la API
 urlpatterns = [
     path('admin/', admin.site.urls),
     # Incluir URLs de equipos ANTES del router para que las rutas personalizadas tengan prioridad
     path('api/equipos/', include('equipos.urls')),
-    # Incluir URLs de usuarios (incluye token personalizado y registro)
+    # Incluir URLs de usuarios (incluye token personalizado, renovación, revocación y registro)
     path('api/', include('users.urls')),
-    # JWT token refresh endpoint
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    # Métricas de la caché de sedes, servicios y responsables
+    path('api/cache/reference/', reference_cache_stats, name='reference-cache-stats'),
+    path('api/async/', include(async_urlpatterns)),
+    # Carga inicial del tablero (referencias + primera página de equipos)
+    path('api/bootstrap/', bootstrap, name='bootstrap'),
     # Router de DRF (debe ir después de las rutas personalizadas)
     path('', include(router.urls)),  # Ruta raíz redirige a la API
     path('api/', include(router.urls)),
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Equipos
+from .search import search
 
 
 @admin.register(Equipos)
@@ -7,3 +8,11 @@ class EquiposAdmin(admin.ModelAdmin):
 	list_display = ('inventory_code', 'name', 'site', 'service', 'responsible')
 	search_fields = ('inventory_code', 'name', 'ips_code')
 	list_filter = ('site', 'service')
+	list_select_related = ('site', 'service', 'responsible')
+
+	def get_search_results(self, request, queryset, search_term):
+		# Usa el índice de texto completo en lugar de LIKE '%...%'
+		if not search_term.strip():
+			return queryset, False
+		ids = search(Equipos.objects.all(), search_term).values('id')
+		return queryset.filter(id__in=ids), False
@@ -0,0 +1,35 @@
+from datetime import date
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.response import Response
+from backend_lime.async_views import AsyncDRFView
+from backend_lime.conditional import make_etag, not_modified
+from .pagination import MaintenanceEventsPagination
+from .views import _event_from_row, equipos_state, filter_maintenance_events, maintenance_events
+
+
+class MaintenanceEventsAsyncView(AsyncDRFView):
+    """Versión async de ``maintenance_events`` (mismos parámetros, ETag y respuesta)."""
+    drf_view_class = maintenance_events.cls
+
+    async def handle(self, view, request):
+        today = date.today()
+        etag = make_etag(request, await sync_to_async(equipos_state)(references=False), today)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+
+        try:
+            events = filter_maintenance_events(request.query_params, today)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = MaintenanceEventsPagination()
+        page = await sync_to_async(paginator.paginate_queryset)(events, request)
+        if page is not None:
+            response = paginator.get_paginated_response([_event_from_row(row) for row in page])
+        else:
+            response = Response([_event_from_row(row) async for row in events])
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
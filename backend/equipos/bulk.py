@@ -0,0 +1,107 @@
+"""
+Piezas comunes de las operaciones masivas sobre equipos (``bulk``,
+``transfer``, ``update-dates`` y la importación): el cuerpo de la petición,
+la carga del lote, la respuesta con el resultado de cada ítem y la escritura
+con ``bulk_create`` / ``bulk_update``.
+"""
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from .models import Equipos
+
+# Máximo de ítems por llamada a las operaciones masivas
+BULK_MAX_ITEMS = 1000
+
+
+def parse_payload(data, key, required, single=False):
+    """
+    Ítems y ``partial`` del cuerpo de una operación masiva: la lista o
+    ``{key: [...], "partial": false}``. Con ``single`` un objeto sin ``key``
+    es un único ítem. Sin ítems, o con más de ``BULK_MAX_ITEMS``, responde 400
+    con ``required`` o el límite como ``error``.
+    """
+    partial = False
+    if isinstance(data, dict):
+        if single and key not in data:
+            data = [data]
+        else:
+            partial = str(data.get('partial', '')).lower() in ('1', 'true')
+            data = data.get(key)
+
+    if not isinstance(data, list) or not data:
+        raise ValidationError({'error': required})
+    if len(data) > BULK_MAX_ITEMS:
+        raise ValidationError({'error': f'Se permiten hasta {BULK_MAX_ITEMS} ítems por llamada'})
+    return data, partial
+
+
+def item_id(item, key='id'):
+    """Id entero de un ítem (o el ítem mismo si no es un objeto); ``None`` si falta o es inválido."""
+    value = item.get(key) if isinstance(item, dict) else item
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def load_equipos(ids, *fields, for_update=False):
+    """Equipos del lote por id (``in_bulk``), con una sola consulta."""
+    queryset = Equipos.objects.all()
+    if for_update:
+        queryset = queryset.select_for_update()
+    if fields:
+        queryset = queryset.only(*fields)
+    return queryset.in_bulk({pk for pk in ids if pk is not None})
+
+
+def is_failed(result):
+    """Un ítem falló si su resultado trae ``error`` (mensaje) o ``errors`` (por campo)."""
+    return 'error' in result or 'errors' in result
+
+
+def batch_response(results, count_key='applied', cancelled=False):
+    """
+    Respuesta con el resultado de cada ítem, en el orden de entrada, y los
+    totales. Con ``cancelled`` el lote no se aplicó (400): tampoco los ítems
+    válidos cuentan como exitosos.
+    """
+    failed = sum(is_failed(result) for result in results)
+    for result in results:
+        result['success'] = not cancelled and not is_failed(result)
+    return Response({
+        'success': not failed and not cancelled,
+        count_key: 0 if cancelled else len(results) - failed,
+        'failed': failed,
+        'results': results,
+    }, status=status.HTTP_400_BAD_REQUEST if cancelled else status.HTTP_200_OK)
+
+
+def create_equipos(equipos):
+    """Inserta ``equipos`` con ``bulk_create``, que no pasa por save(): aquí se calculan los campos derivados."""
+    for equipo in equipos:
+        equipo.refresh_derived_fields()
+    return Equipos.objects.bulk_create(equipos)
+
+
+def update_equipos(changes):
+    """
+    Guarda pares ``(equipo, campos cambiados)`` con ``bulk_update``, como
+    ``save(update_fields=...)``: se recalculan los campos derivados de esos
+    campos y se fija ``updated_at`` (bulk_update no aplica auto_now). Hay un
+    UPDATE por conjunto de columnas; los equipos sin cambios se omiten.
+    Devuelve los equipos guardados.
+    """
+    now = timezone.now()
+    groups = {}
+    for equipo, fields in changes:
+        if not fields:
+            continue
+        # Solo lo necesario: el lote puede venir con columnas diferidas (only())
+        derived = equipo.refresh_derived_fields(fields)
+        equipo.updated_at = now
+        groups.setdefault(frozenset({*fields, *derived, 'updated_at'}), []).append(equipo)
+
+    for fields, equipos in groups.items():
+        Equipos.objects.bulk_update(equipos, sorted(fields))
+    return [equipo for equipos in groups.values() for equipo in equipos]
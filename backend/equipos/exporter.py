@@ -0,0 +1,65 @@
+import csv
+import tempfile
+from datetime import date
+from .parsing import F147_COLUMNS, RESPONSABLE_HEADER, SEDE_HEADER, SERVICIO_HEADER
+
+# Mismas columnas que lee import_equipos_csv, para que un export pueda volver
+# a importarse: (campo o lookup para values(), encabezado, tipo).
+EXPORT_COLUMNS = [
+    (SEDE_HEADER, 'site__nombre_sede', 'str'),
+    (SERVICIO_HEADER, 'service__nombre', 'str'),
+    (RESPONSABLE_HEADER, 'responsible__name', 'str'),
+] + [(header, field, kind) for field, header, kind in F147_COLUMNS]
+
+EXPORT_HEADERS = [header for header, _, _ in EXPORT_COLUMNS]
+
+
+def _format_value(value, kind):
+    if value is None:
+        return ''
+    if kind == 'bool':
+        return 'Sí' if value else 'No'
+    if isinstance(value, date):
+        return value.strftime('%d/%m/%Y')
+    return value
+
+
+def iter_export_rows(queryset, chunk_size=2000):
+    """Filas del inventario (como listas) leídas por bloques con ``iterator()``."""
+    lookups = [lookup for _, lookup, _ in EXPORT_COLUMNS]
+    kinds = [kind for _, _, kind in EXPORT_COLUMNS]
+    for row in queryset.values_list(*lookups).iterator(chunk_size=chunk_size):
+        yield [_format_value(value, kind) for value, kind in zip(row, kinds)]
+
+
+class _Echo:
+    """Pseudo-buffer para csv.writer: devuelve la línea en lugar de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset):
+    """Genera el CSV línea por línea (con BOM para que Excel detecte UTF-8)."""
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(EXPORT_HEADERS)
+    for row in iter_export_rows(queryset):
+        yield writer.writerow(row)
+
+
+def write_xlsx(queryset):
+    """
+    Escribe el XLSX en un archivo temporal en modo ``write_only`` (las filas no
+    quedan en memoria) y lo devuelve abierto y posicionado al inicio.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Inventario')
+    sheet.append(EXPORT_HEADERS)
+    for row in iter_export_rows(queryset):
+        sheet.append(row)
+    tmp = tempfile.TemporaryFile(suffix='.xlsx')
+    workbook.save(tmp)
+    tmp.seek(0)
+    return tmp
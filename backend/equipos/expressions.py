@@ -0,0 +1,70 @@
+from django.db.models import Case, DateField, Func, IntegerField, Q, When
+from django.db.models.functions import Coalesce
+
+
+class AddMonths(Func):
+    """
+    ``fecha + n meses`` calculado en la base de datos.
+
+    Igual que ``calculate_next_date``: si el día no existe en el mes destino
+    (31 de enero + 1 mes) se usa el último día de ese mes.
+    """
+    arity = 2
+    output_field = DateField()
+
+    def _compile_args(self, compiler):
+        date_sql, date_params = compiler.compile(self.source_expressions[0])
+        months_sql, months_params = compiler.compile(self.source_expressions[1])
+        return date_sql, tuple(date_params), months_sql, tuple(months_params)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        # PostgreSQL ajusta al fin de mes al sumar un intervalo de meses.
+        date_sql, date_params, months_sql, months_params = self._compile_args(compiler)
+        sql = f'CAST(({date_sql}) + make_interval(months => ({months_sql})::integer) AS date)'
+        return sql, date_params + months_params
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # SQLite desborda al mes siguiente (31/01 + 1 mes = 03/03), así que se
+        # toma el mínimo entre esa fecha y el último día del mes destino.
+        date_sql, date_params, months_sql, months_params = self._compile_args(compiler)
+        sql = (
+            f"MIN(date({date_sql}, '+' || ({months_sql}) || ' months'), "
+            f"date({date_sql}, 'start of month', '+' || (({months_sql}) + 1) || ' months', '-1 day'))"
+        )
+        return sql, date_params + months_params + date_params + months_params
+
+
+def next_dates():
+    """
+    ``next_maintenance_date`` y ``next_calibration_date`` como expresiones,
+    para recalcularlas con un solo UPDATE (``backfill_next_dates``; la
+    migración 0006 tiene su propia copia). Igual que
+    ``Equipos.refresh_next_dates``.
+    """
+    return {
+        f'next_{kind}_date': Case(
+            When(
+                Q(**{f'{kind}_required': True, f'{kind}_frequency__gt': 0}),
+                then=AddMonths(Coalesce(f'last_{kind}_date', 'acquisition_date'), f'{kind}_frequency'),
+            ),
+            default=None,
+        )
+        for kind in ('maintenance', 'calibration')
+    }
+
+
+class DaysBetween(Func):
+    """Días enteros desde la fecha ``start`` hasta la fecha ``end`` (``end - start``)."""
+    arity = 2
+    output_field = IntegerField()
+
+    def _render(self, compiler, template):
+        start_sql, start_params = compiler.compile(self.source_expressions[0])
+        end_sql, end_params = compiler.compile(self.source_expressions[1])
+        return template % {'start': start_sql, 'end': end_sql}, (*end_params, *start_params)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        return self._render(compiler, '(CAST(%(end)s AS date) - CAST(%(start)s AS date))')
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self._render(compiler, 'CAST(julianday(%(end)s) - julianday(%(start)s) AS integer)')
@@ -0,0 +1,53 @@
+from django.db import connections
+from rest_framework.filters import BaseFilterBackend
+from backend_lime.text import search_key
+
+
+def filter_brand(queryset, brand):
+    """Equipos cuya marca contiene ``brand`` (ya normalizada con ``search_key``)."""
+    queryset = queryset.filter(brand_key__contains=brand)
+    if connections[queryset.db].vendor == 'sqlite' and len(brand) >= 3:
+        # La tabla FTS5 trigram (migración 0012) resuelve el LIKE con su
+        # índice; el filtro anterior mantiene la coincidencia exacta.
+        queryset = queryset.extra(
+            where=['equipos_equipos.id IN (SELECT rowid FROM equipos_fuzzy WHERE brand_key LIKE %s)'],
+            params=[f'%{brand}%'],
+        )
+    return queryset
+
+
+class EquiposFilterBackend(BaseFilterBackend):
+    """
+    Filtros del listado de equipos, equivalentes a los de ``applyFilters`` del
+    frontend:
+
+    - ``status``: uno o varios estados separados por coma (``Activo,Inactivo``)
+    - ``site`` / ``service`` / ``responsible``: id de la relación
+    - ``brand``: subcadena, sin distinguir mayúsculas ni tildes (sobre
+      ``brand_key``; la resuelven los índices de trigramas de la migración
+      0012)
+    - ``inventory_code``: coincidencia exacta
+    """
+    relation_params = ('site', 'service', 'responsible')
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        statuses = [s.strip() for s in params.get('status', '').split(',') if s.strip()]
+        if statuses:
+            queryset = queryset.filter(status__in=statuses)
+
+        for param in self.relation_params:
+            value = params.get(param)
+            if value and value.isdigit():
+                queryset = queryset.filter(**{f'{param}_id': int(value)})
+
+        brand = search_key(params.get('brand'))
+        if brand:
+            queryset = filter_brand(queryset, brand)
+
+        inventory_code = params.get('inventory_code')
+        if inventory_code is not None:
+            queryset = queryset.filter(inventory_code=inventory_code)
+
+        return queryset
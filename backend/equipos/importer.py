@@ -0,0 +1,248 @@
+import csv
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from itertools import islice
+from django.db import transaction
+from django.db.models import Q
+from backend_lime.reference_cache import invalidate as invalidate_reference_cache
+from backend_lime.text import search_key
+from responsables.models import Responsable
+from sedes.models import Sede
+from servicios.models import Servicio
+from .bulk import create_equipos, update_equipos
+from .models import Equipos
+from .parsing import parse_batch
+
+
+def iter_csv_rows(f):
+    """Filas de un CSV como dicts, leídas de forma perezosa."""
+    return csv.DictReader(f)
+
+
+def _xlsx_cell(value):
+    # Se normalizan los valores tipados de Excel a texto, como vendrían del CSV.
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def iter_xlsx_rows(path):
+    """Filas de la primera hoja de un XLSX como dicts, sin cargar el libro completo."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError('Para importar archivos XLSX instale openpyxl (pip install openpyxl).')
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        headers = [_xlsx_cell(h).strip() for h in next(rows, ())]
+        for values in rows:
+            yield dict(zip(headers, (_xlsx_cell(v) for v in values)))
+    finally:
+        workbook.close()
+
+
+def _batches(rows, size, first_row):
+    """Agrupa ``rows`` en lotes ``(número de la primera fila, filas)``."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield first_row, batch
+        first_row += len(batch)
+
+
+def _parallel_parse(batches, max_lengths, workers):
+    """
+    Parsea los lotes en un pool de procesos conservando el orden. Se mantienen
+    a lo sumo ``2 * workers`` lotes en vuelo para no leer el archivo por
+    adelantado.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for first_row, batch in batches:
+            pending.append(pool.submit(parse_batch, first_row, batch, max_lengths))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class EquiposImporter:
+    """
+    Motor de importación de la hoja F-147 con semántica de upsert, en tres
+    etapas:
+
+    1. parseo y validación de cada fila (``parsing.parse_batch``), en un pool
+       de ``workers`` procesos cuando ``workers > 1``;
+    2. validación contra la base de datos (responsable obligatorio);
+    3. escritura por bloques: cada bloque busca sus equipos existentes en una
+       sola consulta (por ``inventory_code`` o ``ips_code``), crea los nuevos
+       con ``bulk_create`` y actualiza con ``bulk_update`` solo las columnas
+       que cambiaron.
+
+    Las filas se consumen en bloques de ``batch_size`` sin materializar el
+    archivo completo. Cada bloque se confirma en su propia transacción, de
+    modo que una importación interrumpida puede retomarse con ``start_row``;
+    con ``dry_run`` todas se revierten. Las filas con errores no se escriben
+    y quedan en ``errors`` como ``(fila, código de inventario, mensaje)``.
+    """
+
+    def __init__(self, batch_size=500, dry_run=False, workers=1):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.workers = workers
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.errors = []
+        self.last_row = 0
+        self.elapsed = 0.0
+        self._lookups_loaded = False
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def rejected(self):
+        return len({row_number for row_number, _, _ in self.errors})
+
+    def _load_lookups(self):
+        # Igual que el import original: si hay nombres repetidos gana el primero.
+        self.sedes = {}
+        for pk, name in Sede.objects.order_by('-pk').values_list('pk', 'nombre_sede'):
+            self.sedes[name] = pk
+        self.servicios = {}
+        for pk, name in Servicio.objects.order_by('-pk').values_list('pk', 'nombre'):
+            self.servicios[name] = pk
+        # Los responsables se buscan por su clave normalizada: "José Pérez" y
+        # "JOSE PEREZ" son la misma persona.
+        self.responsables = {}
+        for pk, key in Responsable.objects.order_by('-pk').values_list('pk', 'name_key'):
+            self.responsables[key] = pk
+        self._lookups_loaded = True
+
+    def _create_missing_responsables(self, names):
+        missing = {}
+        for name in names:
+            key = search_key(name, 200)
+            if key and key not in self.responsables:
+                missing.setdefault(key, name)
+        if not missing:
+            return
+        Responsable.objects.bulk_create([
+            Responsable(name=name, name_key=key, role='') for key, name in missing.items()
+        ])
+        # bulk_create no emite post_save
+        invalidate_reference_cache(Responsable)
+        # Se vuelven a leer para tener los ids en todos los motores de BD.
+        for pk, key in Responsable.objects.filter(name_key__in=missing).values_list('pk', 'name_key'):
+            self.responsables.setdefault(key, pk)
+
+    def _existing(self, parsed):
+        inventory_codes = {v['inventory_code'] for _, v, _ in parsed if v['inventory_code']}
+        ips_codes = {v['ips_code'] for _, v, _ in parsed if v['ips_code']}
+        index = {}
+        if inventory_codes or ips_codes:
+            for equipo in Equipos.objects.filter(Q(inventory_code__in=inventory_codes) | Q(ips_code__in=ips_codes)):
+                if equipo.inventory_code:
+                    index[('inventory_code', equipo.inventory_code)] = equipo
+                if equipo.ips_code:
+                    index[('ips_code', equipo.ips_code)] = equipo
+        return index
+
+    def _write_batch(self, parsed):
+        valid = []
+        for row_number, values, relations, errors in parsed:
+            for message in errors:
+                self.errors.append((row_number, values['inventory_code'], message))
+            if not errors:
+                valid.append((row_number, values, relations))
+
+        self._create_missing_responsables(relations['responsible'] for _, _, relations in valid)
+        index = self._existing(valid)
+
+        to_create = []
+        changed_fields = {}
+        for row_number, values, relations in valid:
+            relations = {
+                'site_id': self.sedes.get(relations['site']),
+                'service_id': self.servicios.get(relations['service']),
+                'responsible_id': self.responsables.get(search_key(relations['responsible'], 200)),
+            }
+            by_inventory = index.get(('inventory_code', values['inventory_code']))
+            by_ips = index.get(('ips_code', values['ips_code']))
+            if by_inventory is not None and by_ips is not None and by_inventory is not by_ips:
+                # Escribir la fila violaría la unicidad de uno de los códigos
+                # (con otro equipo existente o con otra fila del bloque).
+                self.errors.append((
+                    row_number, values['inventory_code'],
+                    f'El código IPS {values["ips_code"]} pertenece a otro equipo',
+                ))
+                continue
+            equipo = by_inventory or by_ips
+            if equipo is None:
+                if relations['responsible_id'] is None:
+                    self.errors.append((row_number, values['inventory_code'], 'Falta el responsable del equipo'))
+                    continue
+                # Las columnas vacías toman el valor por defecto del modelo
+                equipo = Equipos(**{k: v for k, v in values.items() if v is not None}, **relations)
+                to_create.append(equipo)
+            else:
+                # Una celda vacía en la hoja (relación, código o cualquier otra
+                # columna) no borra el valor existente.
+                values = {k: v for k, v in {**values, **relations}.items() if v is not None and v != ''}
+                changed = {f for f, v in values.items() if getattr(equipo, f) != v}
+                for field in changed:
+                    setattr(equipo, field, values[field])
+                if equipo.pk is not None:
+                    changed_fields.setdefault(equipo.pk, (equipo, set()))[1].update(changed)
+            # Las filas repetidas dentro del bloque actualizan el mismo objeto.
+            for key in ('inventory_code', 'ips_code'):
+                if getattr(equipo, key):
+                    index[(key, getattr(equipo, key))] = equipo
+
+        create_equipos(to_create)
+        updated = update_equipos(changed_fields.values())
+        self.created += len(to_create)
+        self.updated += len(updated)
+        self.unchanged += len(changed_fields) - len(updated)
+
+    def run(self, rows, start_row=1):
+        """
+        Importa ``rows`` (un iterable de dicts). ``start_row`` es el número de
+        la primera fila de datos a procesar (1 = desde el inicio).
+        """
+        started = time.perf_counter()
+        if not self._lookups_loaded:
+            self._load_lookups()
+        max_lengths = {
+            f.name: f.max_length for f in Equipos._meta.concrete_fields if getattr(f, 'max_length', None)
+        }
+
+        batches = _batches(islice(rows, start_row - 1, None), self.batch_size, start_row)
+        if self.workers > 1:
+            parsed_batches = _parallel_parse(batches, max_lengths, self.workers)
+        else:
+            parsed_batches = (parse_batch(first_row, batch, max_lengths) for first_row, batch in batches)
+
+        self.last_row = start_row - 1
+        for parsed in parsed_batches:
+            with transaction.atomic():
+                self._write_batch(parsed)
+                if self.dry_run:
+                    transaction.set_rollback(True)
+            self.rows += len(parsed)
+            self.last_row += len(parsed)
+        self.elapsed = time.perf_counter() - started
+        return self
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Now
+from equipos.expressions import next_dates
+from equipos.models import Equipos
+
+
+class Command(BaseCommand):
+    help = 'Recalcula next_maintenance_date y next_calibration_date de todos los equipos.'
+
+    def handle(self, *args, **kwargs):
+        # Una sola sentencia UPDATE: el cálculo se hace en la base de datos.
+        updated = Equipos.objects.update(**next_dates(), updated_at=Now())
+        self.stdout.write(self.style.SUCCESS(f'Se recalcularon las próximas fechas de {updated} equipos.'))
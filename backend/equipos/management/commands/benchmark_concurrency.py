@@ -0,0 +1,88 @@
+import threading
+import time
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections, transaction
+from equipos.models import Equipos
+
+SCRATCH_TABLE = 'benchmark_concurrency_writes'
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide cuántas lecturas del listado de equipos por segundo se atienden mientras otros hilos '
+        'escriben. Las escrituras van a una tabla temporal en la misma base de datos (que se borra '
+        'al terminar); en SQLite bloquean igual que las de equipos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4, help='Hilos lectores (por defecto 4).')
+        parser.add_argument('--writers', type=int, default=1, help='Hilos escritores (por defecto 1).')
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duración de cada medición (por defecto 5).')
+
+    def handle(self, *args, **kwargs):
+        self._execute(f'CREATE TABLE {SCRATCH_TABLE} (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)')
+        try:
+            # Una pasada previa: los errores que no son de bloqueo se ven aquí
+            self._read()
+            self._write()
+            if connection.vendor == 'sqlite':
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode')
+                    self.stdout.write(f'SQLite, journal_mode={cursor.fetchone()[0]}')
+            else:
+                self.stdout.write(connection.vendor)
+            self._report('Solo lecturas', kwargs['readers'], 0, kwargs['seconds'])
+            self._report('Lecturas con escrituras', kwargs['readers'], kwargs['writers'], kwargs['seconds'])
+        finally:
+            self._execute(f'DROP TABLE {SCRATCH_TABLE}')
+
+    def _execute(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def _report(self, title, readers, writers, seconds):
+        counts = {'reads': 0, 'writes': 0, 'errors': 0}
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def run(operation, counter):
+            done = errors = 0
+            try:
+                while not stop.is_set():
+                    try:
+                        operation()
+                        done += 1
+                    except OperationalError:
+                        # "database is locked" tras agotar busy_timeout
+                        errors += 1
+            finally:
+                # Cada hilo usa su propia conexión
+                connections.close_all()
+                with lock:
+                    counts[counter] += done
+                    counts['errors'] += errors
+
+        threads = [threading.Thread(target=run, args=(self._read, 'reads')) for _ in range(readers)]
+        threads += [threading.Thread(target=run, args=(self._write, 'writes')) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n{title} ({readers} lectores, {writers} escritores)'))
+        self.stdout.write(
+            f'   - Lecturas: {counts["reads"] / seconds:.0f}/s\n'
+            f'   - Escrituras: {counts["writes"] / seconds:.0f}/s\n'
+            f'   - Errores por bloqueo: {counts["errors"]}'
+        )
+
+    def _read(self):
+        # La primera página del listado por defecto
+        list(Equipos.objects.select_related('site', 'service', 'responsible').order_by('id')[:50])
+
+    def _write(self):
+        # Una transacción corta, como update_maintenance_date
+        with transaction.atomic():
+            self._execute(f'INSERT INTO {SCRATCH_TABLE} (value) VALUES (%s)', [1])
@@ -0,0 +1,77 @@
+import time
+from datetime import date
+from io import BytesIO
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from backend_lime import renderers
+from equipos.models import Equipos
+from equipos.serializers import EquiposSerializer
+from responsables.models import Responsable
+from sedes.models import Sede
+from servicios.models import Servicio
+
+
+def _sample_equipos(count):
+    """Equipos en memoria (sin tocar la base de datos) con fechas y relaciones."""
+    sede = Sede(pk=1, nombre_sede='Sede Norte')
+    servicio = Servicio(pk=1, nombre='Laboratorio clínico', sede=sede)
+    responsable = Responsable(pk=1, name='José Pérez', role='Coordinador')
+    equipos = []
+    for i in range(count):
+        equipo = Equipos(
+            pk=i + 1, inventory_code=f'INV-{i:05d}', name=f'Centrífuga {i}', brand='Thermo',
+            model='X1', serial=f'SN-{i}', status='Activo', ecri_code=f'ECRI-{i}',
+            site=sede, service=servicio, responsible=responsable,
+            acquisition_date=date(2020, 1 + i % 12, 1 + i % 28), useful_life=10,
+            maintenance_required=True, maintenance_frequency=6, last_maintenance_date=date(2024, 3, 15),
+            calibration_required=bool(i % 2), calibration_frequency=12, purchase_value='1500000.50',
+        )
+        equipo.refresh_derived_fields()
+        equipos.append(equipo)
+    return equipos
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara el renderer y el parser JSON del API (orjson) con los de DRF (json de la '
+        'biblioteca estándar) sobre el listado completo de N equipos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000, help='Equipos del listado (por defecto 10000).')
+        parser.add_argument('--repeat', type=int, default=5, help='Repeticiones de cada medición (por defecto 5).')
+
+    def handle(self, *args, **kwargs):
+        if renderers.orjson is None:
+            raise CommandError('orjson no está instalado: el API ya usa el renderer de DRF.')
+
+        started = time.perf_counter()
+        data = EquiposSerializer(_sample_equipos(kwargs['count']), many=True).data
+        self.stdout.write(f'Serializador ({kwargs["count"]} equipos): {time.perf_counter() - started:.2f} s')
+
+        body = JSONRenderer().render(data)
+        if renderers.FastJSONRenderer().render(data) != body:
+            raise CommandError('Los renderers producen salidas distintas.')
+        self.stdout.write(f'Respuesta: {len(body) / 1024 / 1024:.1f} MB')
+
+        rows = [
+            ('Render', lambda: JSONRenderer().render(data), lambda: renderers.FastJSONRenderer().render(data)),
+            ('Parse', lambda: JSONParser().parse(BytesIO(body)), lambda: renderers.FastJSONParser().parse(BytesIO(body))),
+        ]
+        for label, stdlib, fast in rows:
+            stdlib_time = self._measure(stdlib, kwargs['repeat'])
+            fast_time = self._measure(fast, kwargs['repeat'])
+            self.stdout.write(
+                f'{label}: json {stdlib_time * 1000:.0f} ms, orjson {fast_time * 1000:.0f} ms '
+                f'({stdlib_time / fast_time:.1f}x)'
+            )
+
+    def _measure(self, func, repeat):
+        # El mejor de ``repeat`` intentos
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+        return best
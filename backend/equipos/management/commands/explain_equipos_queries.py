@@ -0,0 +1,80 @@
+import time
+from datetime import date
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from equipos.filters import filter_brand
+from equipos.models import Equipos
+from equipos.views import maintenance_events_queryset
+
+
+def _query_shapes():
+    """Consultas frecuentes sobre equipos, con valores tomados de un equipo existente."""
+    sample = Equipos.objects.exclude(site=None).exclude(service=None).first() or Equipos()
+    brand = sample.brand_key or 'abc'
+    today = date.today()
+    return [
+        ('estado', Equipos.objects.filter(status='Activo')),
+        ('estado + sede + servicio', Equipos.objects.filter(
+            status='Activo', site_id=sample.site_id, service_id=sample.service_id,
+        )),
+        ('marca (subcadena)', filter_brand(Equipos.objects.all(), brand)),
+        ('código IPS', Equipos.objects.filter(ips_code=sample.ips_code or '')),
+        ('eventos de mantenimiento', maintenance_events_queryset('maintenance', today)),
+        ('eventos de calibración', maintenance_events_queryset('calibration', today)),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Muestra el plan de ejecución y el tiempo de las consultas frecuentes sobre equipos. '
+        'Con --compare también los muestra sin los índices de Equipos.Meta.indexes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Ejecuciones de cada consulta para medir el tiempo (por defecto 20).',
+        )
+        parser.add_argument(
+            '--compare', action='store_true',
+            help=(
+                'Elimina los índices dentro de una transacción que se revierte y repite la medición. '
+                'Bloquea la tabla mientras dura: úselo sobre una copia de la base de datos.'
+            ),
+        )
+
+    def handle(self, *args, **kwargs):
+        repeat = kwargs['repeat']
+        self.stdout.write(f'Equipos: {Equipos.objects.count()} filas ({connection.vendor})')
+        if not kwargs['compare']:
+            self._report('Con índices', repeat)
+            return
+
+        with transaction.atomic():
+            self._report('Con índices', repeat)
+            # DROP INDEX directo: el schema editor de SQLite no admite una transacción abierta.
+            with connection.cursor() as cursor:
+                for index in Equipos._meta.indexes:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
+            self._report('Sin índices', repeat)
+            transaction.set_rollback(True)
+
+    def _report(self, title, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n{title}'))
+        for label, queryset in _query_shapes():
+            started = time.perf_counter()
+            for _ in range(repeat):
+                list(queryset.all())
+            elapsed = (time.perf_counter() - started) / repeat * 1000
+            self.stdout.write(f'\n{label}: {elapsed:.2f} ms')
+            for line in self._explain(queryset, title):
+                self.stdout.write(f'    {line}')
+
+    def _explain(self, queryset, title):
+        # El comentario hace única la sentencia: SQLite no vuelve a planificar
+        # un EXPLAIN guardado en la caché de sentencias al cambiar los índices.
+        sql, params = queryset.query.sql_with_params()
+        prefix = connection.ops.explain_query_prefix()
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} /* {title} */ {sql}', params)
+            return [' '.join(str(column) for column in row) for row in cursor.fetchall()]
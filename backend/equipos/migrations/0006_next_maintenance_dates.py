@@ -0,0 +1,70 @@
+# Generated by Django 4.2 on 2026-10-17 12:25
+
+from django.db import migrations, models
+from django.db.models import Case, Func, Q, When
+from django.db.models.functions import Coalesce
+
+
+class AddMonths(Func):
+    # Copia congelada de equipos.expressions.AddMonths
+    arity = 2
+    output_field = models.DateField()
+
+    def _compile_args(self, compiler):
+        date_sql, date_params = compiler.compile(self.source_expressions[0])
+        months_sql, months_params = compiler.compile(self.source_expressions[1])
+        return date_sql, tuple(date_params), months_sql, tuple(months_params)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        date_sql, date_params, months_sql, months_params = self._compile_args(compiler)
+        sql = f'CAST(({date_sql}) + make_interval(months => ({months_sql})::integer) AS date)'
+        return sql, date_params + months_params
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        date_sql, date_params, months_sql, months_params = self._compile_args(compiler)
+        sql = (
+            f"MIN(date({date_sql}, '+' || ({months_sql}) || ' months'), "
+            f"date({date_sql}, 'start of month', '+' || (({months_sql}) + 1) || ' months', '-1 day'))"
+        )
+        return sql, date_params + months_params + date_params + months_params
+
+
+def _next_dates():
+    # Copia congelada de equipos.expressions.next_dates
+    return {
+        f'next_{kind}_date': Case(
+            When(
+                Q(**{f'{kind}_required': True, f'{kind}_frequency__gt': 0}),
+                then=AddMonths(Coalesce(f'last_{kind}_date', 'acquisition_date'), f'{kind}_frequency'),
+            ),
+            default=None,
+        )
+        for kind in ('maintenance', 'calibration')
+    }
+
+
+def backfill_next_dates(apps, schema_editor):
+    # Sin esto los equipos existentes quedarían con las fechas en NULL
+    Equipos = apps.get_model('equipos', 'Equipos')
+    Equipos.objects.using(schema_editor.connection.alias).update(**_next_dates())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipos', '0005_alter_equipos_acquisition_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipos',
+            name='next_calibration_date',
+            field=models.DateField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='equipos',
+            name='next_maintenance_date',
+            field=models.DateField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_next_dates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-17 12:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # EquipoDocumento estaba en models.py sin migración: sin la tabla, el
+    # borrado en cascada de cualquier equipo fallaba.
+
+    dependencies = [
+        ('equipos', '0007_equipos_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipoDocumento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100)),
+                ('archivo', models.FileField(upload_to='documentos_equipos/')),
+                ('fecha_subida', models.DateTimeField(auto_now_add=True)),
+                ('equipo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='documentos', to='equipos.equipos')),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2 on 2026-10-17 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipos', '0008_equipodocumento'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipoTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('equipo_id', models.BigIntegerField()),
+                ('inventory_code', models.CharField(blank=True, max_length=50, null=True)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 4.2 on 2026-10-17 12:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('responsables', '0002_rename_fields'),
+        ('servicios', '0002_servicio_sede'),
+        ('sedes', '0005_remove_sede_direccion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('equipos', '0009_equipotombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipoTransfer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('inventory_code', models.CharField(blank=True, max_length=50, null=True)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('date', models.DateField()),
+                ('justification', models.TextField()),
+                ('signature', models.TextField(blank=True)),
+                ('equipo', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipos.equipos')),
+                ('from_responsible', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='responsables.responsable')),
+                ('from_service', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='servicios.servicio')),
+                ('from_site', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='sedes.sede')),
+                ('to_responsible', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='responsables.responsable')),
+                ('to_service', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='servicios.servicio')),
+                ('to_site', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='sedes.sede')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EquipoMaintenanceRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('inventory_code', models.CharField(blank=True, max_length=50, null=True)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('type', models.CharField(choices=[('maintenance', 'Mantenimiento'), ('calibration', 'Calibración')], max_length=20)),
+                ('date', models.DateField()),
+                ('equipo', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipos.equipos')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EquipoDecommission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('inventory_code', models.CharField(blank=True, max_length=50, null=True)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('date', models.DateField()),
+                ('reason', models.TextField()),
+                ('equipo', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='equipos.equipos')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='equipotransfer',
+            index=models.Index(fields=['equipo', 'timestamp'], name='equipo_transfer_eq_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipomaintenancerecord',
+            index=models.Index(fields=['equipo', 'timestamp'], name='equipo_maint_eq_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipodecommission',
+            index=models.Index(fields=['equipo', 'timestamp'], name='equipo_decom_eq_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+from django.db import migrations
+
+# Copia congelada de equipos.search.SEARCH_COLUMNS / POSTGRES_DOCUMENT
+COLUMNS = (
+    'name', 'brand', 'model', 'serial', 'inventory_code', 'ips_code', 'ecri_code', 'provider', 'physical_location',
+)
+
+SQLITE_FORWARD = [
+    f"""
+    CREATE VIRTUAL TABLE equipos_search USING fts5(
+        {', '.join(COLUMNS)},
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    INSERT INTO equipos_search (rowid, {', '.join(COLUMNS)})
+    SELECT id, {', '.join(COLUMNS)} FROM equipos_equipos
+    """,
+    f"""
+    CREATE TRIGGER equipos_search_insert AFTER INSERT ON equipos_equipos BEGIN
+        INSERT INTO equipos_search (rowid, {', '.join(COLUMNS)})
+        VALUES (new.id, {', '.join(f'new.{c}' for c in COLUMNS)});
+    END
+    """,
+    """
+    CREATE TRIGGER equipos_search_delete AFTER DELETE ON equipos_equipos BEGIN
+        DELETE FROM equipos_search WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER equipos_search_update AFTER UPDATE OF {', '.join(COLUMNS)} ON equipos_equipos BEGIN
+        UPDATE equipos_search SET {', '.join(f'{c} = new.{c}' for c in COLUMNS)} WHERE rowid = old.id;
+    END
+    """,
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS equipos_search_update',
+    'DROP TRIGGER IF EXISTS equipos_search_delete',
+    'DROP TRIGGER IF EXISTS equipos_search_insert',
+    'DROP TABLE IF EXISTS equipos_search',
+]
+
+POSTGRES_DOCUMENT = "to_tsvector('simple', {})".format(
+    " || ' ' || ".join(f'coalesce("equipos_equipos"."{column}", \'\')' for column in COLUMNS)
+)
+
+POSTGRES_FORWARD = [
+    f'CREATE INDEX equipos_search_tsv_idx ON equipos_equipos USING gin (({POSTGRES_DOCUMENT}))',
+]
+
+POSTGRES_BACKWARD = ['DROP INDEX IF EXISTS equipos_search_tsv_idx']
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for sql in statements.get(vendor, ()):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipos', '0010_equipo_history'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 4.2 on 2026-10-17 12:45
+
+import unicodedata
+from django.db import migrations, models
+
+KEYS = {'name_key': ('name', 100), 'brand_key': ('brand', 20), 'provider_key': ('provider', 100)}
+
+# Índice de trigramas para la búsqueda aproximada. En SQLite es una tabla FTS5
+# con el tokenizador trigram mantenida por triggers; en PostgreSQL, índices GIN
+# de pg_trgm sobre cada clave.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE equipos_fuzzy USING fts5(name_key, brand_key, provider_key, tokenize = 'trigram')
+    """,
+    """
+    INSERT INTO equipos_fuzzy (rowid, name_key, brand_key, provider_key)
+    SELECT id, name_key, brand_key, provider_key FROM equipos_equipos
+    """,
+    """
+    CREATE TRIGGER equipos_fuzzy_insert AFTER INSERT ON equipos_equipos BEGIN
+        INSERT INTO equipos_fuzzy (rowid, name_key, brand_key, provider_key)
+        VALUES (new.id, new.name_key, new.brand_key, new.provider_key);
+    END
+    """,
+    """
+    CREATE TRIGGER equipos_fuzzy_delete AFTER DELETE ON equipos_equipos BEGIN
+        DELETE FROM equipos_fuzzy WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER equipos_fuzzy_update AFTER UPDATE OF name_key, brand_key, provider_key ON equipos_equipos BEGIN
+        UPDATE equipos_fuzzy SET name_key = new.name_key, brand_key = new.brand_key, provider_key = new.provider_key
+        WHERE rowid = old.id;
+    END
+    """,
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS equipos_fuzzy_update',
+    'DROP TRIGGER IF EXISTS equipos_fuzzy_delete',
+    'DROP TRIGGER IF EXISTS equipos_fuzzy_insert',
+    'DROP TABLE IF EXISTS equipos_fuzzy',
+]
+
+POSTGRES_FORWARD = ['CREATE EXTENSION IF NOT EXISTS pg_trgm'] + [
+    f'CREATE INDEX equipos_{key}_trgm_idx ON equipos_equipos USING gin ({key} gin_trgm_ops)' for key in KEYS
+]
+
+POSTGRES_BACKWARD = [f'DROP INDEX IF EXISTS equipos_{key}_trgm_idx' for key in KEYS]
+
+
+def _search_key(value, max_length):
+    # Copia congelada de backend_lime.text.search_key
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    folded = ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+    return ' '.join(folded.split())[:max_length]
+
+
+def fill_search_keys(apps, schema_editor):
+    Equipos = apps.get_model('equipos', 'Equipos')
+    equipos = list(Equipos.objects.only('id', *(source for source, _ in KEYS.values())))
+    for equipo in equipos:
+        for key, (source, max_length) in KEYS.items():
+            setattr(equipo, key, _search_key(getattr(equipo, source), max_length))
+    Equipos.objects.bulk_update(equipos, list(KEYS), batch_size=500)
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipos', '0011_equipos_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipos',
+            name='brand_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='equipos',
+            name='name_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='equipos',
+            name='provider_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(fill_search_keys, migrations.RunPython.noop),
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
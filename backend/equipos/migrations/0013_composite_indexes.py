@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-17 12:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipos', '0012_search_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='equipos',
+            index=models.Index(fields=['status', 'site', 'service'], name='equipos_status_site_svc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipos',
+            index=models.Index(fields=['status', 'next_maintenance_date'], name='equipos_status_next_maint_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipos',
+            index=models.Index(fields=['status', 'next_calibration_date'], name='equipos_status_next_calib_idx'),
+        ),
+    ]
@@ -1,8 +1,36 @@
+from calendar import monthrange
+from datetime import date
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from backend_lime.text import search_key
 from sedes.models import Sede
 from servicios.models import Servicio
 from responsables.models import Responsable
 
+
+def calculate_next_date(last_date, frequency_months):
+    """Calcula la próxima fecha de mantenimiento/calibración basándose en la última fecha y frecuencia"""
+    if not last_date or not frequency_months or frequency_months <= 0:
+        return None
+    
+    # Calcular la próxima fecha sumando los meses
+    year = last_date.year
+    month = last_date.month + frequency_months
+    
+    # Ajustar año si los meses exceden 12
+    while month > 12:
+        month -= 12
+        year += 1
+    
+    try:
+        return date(year, month, last_date.day)
+    except ValueError:
+        # Si el día no existe en el mes (ej: 31 de febrero), usar el último día del mes
+        last_day = monthrange(year, month)[1]
+        return date(year, month, min(last_date.day, last_day))
+
+
 class Equipos(models.Model):
     # normalized field names to match frontend (english)
     # Many fields should be optional for the create flow so the frontend can
@@ -49,6 +77,10 @@ class Equipos(models.Model):
     calibration_required=  models.BooleanField(default=False)
     calibration_frequency= models.IntegerField(null=True, blank=True)
     last_calibration_date = models.DateField(null=True, blank=True)
+    # Próximas fechas calculadas a partir de las anteriores; se mantienen en
+    # save() para poder consultar vencimientos por rango sobre el índice.
+    next_maintenance_date = models.DateField(null=True, blank=True, editable=False, db_index=True)
+    next_calibration_date = models.DateField(null=True, blank=True, editable=False, db_index=True)
     magnitude= models.CharField(max_length=100, null=True, blank=True)
     measurement_range= models.CharField(max_length=100, null=True, blank=True)
     resolution= models.CharField(max_length=100, null=True, blank=True)
@@ -61,12 +93,88 @@ class Equipos(models.Model):
     dimensions= models.CharField(max_length=100, null=True, blank=True)
     weight= models.CharField(max_length=50, null=True, blank=True)
     others= models.TextField(null=True, blank=True) 
+    # Última modificación; sirve de validador para ETag y sincronización
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Claves de búsqueda normalizadas (sin tildes ni mayúsculas), ver backend_lime.text
+    name_key = models.CharField(max_length=100, blank=True, default='', editable=False, db_index=True)
+    brand_key = models.CharField(max_length=20, blank=True, default='', editable=False, db_index=True)
+    provider_key = models.CharField(max_length=100, blank=True, default='', editable=False, db_index=True)
 
-    
+    # Campos de los que dependen next_maintenance_date / next_calibration_date
+    NEXT_DATE_SOURCES = {
+        'next_maintenance_date': ('maintenance_required', 'maintenance_frequency', 'last_maintenance_date', 'acquisition_date'),
+        'next_calibration_date': ('calibration_required', 'calibration_frequency', 'last_calibration_date', 'acquisition_date'),
+    }
+    # Clave de búsqueda -> campo de origen
+    SEARCH_KEY_SOURCES = {'name_key': 'name', 'brand_key': 'brand', 'provider_key': 'provider'}
+
+    class Meta:
+        # Índices para las consultas frecuentes (ver el comando explain_equipos_queries).
+        # ips_code ya tiene el índice de su restricción unique y la marca se
+        # filtra por brand_key.
+        indexes = [
+            # Filtros del listado; status solo usa la primera columna
+            models.Index(fields=['status', 'site', 'service'], name='equipos_status_site_svc_idx'),
+            # Eventos de mantenimiento/calibración: status = 'Activo' y rango de la
+            # próxima fecha. (Un índice parcial sobre los activos no sirve en
+            # SQLite: el planificador prefiere la igualdad sobre status.)
+            models.Index(fields=['status', 'next_maintenance_date'], name='equipos_status_next_maint_idx'),
+            models.Index(fields=['status', 'next_calibration_date'], name='equipos_status_next_calib_idx'),
+        ]
+
+    @classmethod
+    def derived_fields(cls, changed):
+        """Campos calculados que hay que guardar cuando cambian los campos ``changed``."""
+        changed = set(changed)
+        fields = {f for f, sources in cls.NEXT_DATE_SOURCES.items() if changed.intersection(sources)}
+        fields.update(f for f, source in cls.SEARCH_KEY_SOURCES.items() if source in changed)
+        return fields
 
     def __str__(self):
         return f'{self.inventory_code} - {self.name}'
 
+    def refresh_next_dates(self, fields=None):
+        """Recalcula las próximas fechas de mantenimiento y calibración (o solo las de ``fields``)."""
+        if fields is None or 'next_maintenance_date' in fields:
+            self.next_maintenance_date = calculate_next_date(
+                self.last_maintenance_date or self.acquisition_date, self.maintenance_frequency
+            ) if self.maintenance_required else None
+        if fields is None or 'next_calibration_date' in fields:
+            self.next_calibration_date = calculate_next_date(
+                self.last_calibration_date or self.acquisition_date, self.calibration_frequency
+            ) if self.calibration_required else None
+
+    def refresh_search_keys(self, fields=None):
+        """Recalcula las claves de búsqueda normalizadas (o solo las de ``fields``)."""
+        for key_field, source in self.SEARCH_KEY_SOURCES.items():
+            if fields is None or key_field in fields:
+                max_length = self._meta.get_field(key_field).max_length
+                setattr(self, key_field, search_key(getattr(self, source), max_length))
+
+    def refresh_derived_fields(self, changed=None):
+        """
+        Recalcula los campos calculados (usar antes de bulk_create/bulk_update):
+        todos, o solo los que dependen de los campos ``changed``, sin leer
+        columnas diferidas que no hagan falta. Devuelve los recalculados.
+        """
+        if changed is None:
+            derived = {*self.NEXT_DATE_SOURCES, *self.SEARCH_KEY_SOURCES}
+        else:
+            derived = self.derived_fields(changed)
+        self.refresh_next_dates(derived)
+        self.refresh_search_keys(derived)
+        return derived
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.refresh_derived_fields()
+        else:
+            # Solo se escriben (y recalculan) las columnas pedidas y sus derivadas
+            update_fields = set(update_fields)
+            kwargs['update_fields'] = update_fields | self.refresh_derived_fields(update_fields) | {'updated_at'}
+        super().save(*args, **kwargs)
+
     def as_dict(self):
         """Return a dict with useful fields for API/frontend consumption.
 
@@ -120,6 +228,8 @@ class Equipos(models.Model):
             'calibration_required': self.calibration_required,
             'calibration_frequency': self.calibration_frequency,
             'last_calibration_date': _date_to_iso(self.last_calibration_date),
+            'next_maintenance_date': _date_to_iso(self.next_maintenance_date),
+            'next_calibration_date': _date_to_iso(self.next_calibration_date),
             'magnitude': self.magnitude,
             'measurement_range': self.measurement_range,
             'resolution': self.resolution,
@@ -148,3 +258,74 @@ class EquipoDocumento(models.Model):
     fecha_subida = models.DateTimeField(auto_now_add=True)
 
 
+class EquipoTombstone(models.Model):
+    """
+    Marca de un equipo eliminado. La sincronización incremental
+    (``/api/equipos/changes/``) la usa para avisar a los clientes qué ids
+    deben borrar de su copia local.
+    """
+    equipo_id = models.BigIntegerField()
+    inventory_code = models.CharField(max_length=50, null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f'{self.inventory_code or self.equipo_id} (eliminado {self.deleted_at:%Y-%m-%d %H:%M})'
+
+
+class EquipoHistory(models.Model):
+    """
+    Base de los historiales de equipos. Son de solo inserción: un registro
+    guardado no se modifica. Si el equipo se elimina el registro se conserva
+    con su código de inventario.
+    """
+    # Sin índice propio: lo cubre el índice (equipo, timestamp) de cada tabla
+    equipo = models.ForeignKey(Equipos, on_delete=models.SET_NULL, null=True, related_name='+', db_index=False)
+    inventory_code = models.CharField(max_length=50, null=True, blank=True)
+    timestamp = models.DateTimeField(default=timezone.now)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Los registros del historial no se pueden modificar')
+        if self.equipo_id and not self.inventory_code:
+            self.inventory_code = self.equipo.inventory_code
+        super().save(*args, **kwargs)
+
+
+class EquipoTransfer(EquipoHistory):
+    """Traslado de un equipo entre sedes/servicios/responsables."""
+    from_site = models.ForeignKey(Sede, on_delete=models.SET_NULL, null=True, related_name='+')
+    from_service = models.ForeignKey(Servicio, on_delete=models.SET_NULL, null=True, related_name='+')
+    from_responsible = models.ForeignKey(Responsable, on_delete=models.SET_NULL, null=True, related_name='+')
+    to_site = models.ForeignKey(Sede, on_delete=models.SET_NULL, null=True, related_name='+')
+    to_service = models.ForeignKey(Servicio, on_delete=models.SET_NULL, null=True, related_name='+')
+    to_responsible = models.ForeignKey(Responsable, on_delete=models.SET_NULL, null=True, related_name='+')
+    date = models.DateField()
+    justification = models.TextField()
+    signature = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['equipo', 'timestamp'], name='equipo_transfer_eq_ts_idx')]
+
+
+class EquipoDecommission(EquipoHistory):
+    """Baja de un equipo."""
+    date = models.DateField()
+    reason = models.TextField()
+
+    class Meta:
+        indexes = [models.Index(fields=['equipo', 'timestamp'], name='equipo_decom_eq_ts_idx')]
+
+
+class EquipoMaintenanceRecord(EquipoHistory):
+    """Mantenimiento o calibración registrado para un equipo."""
+    TYPE_CHOICES = [('maintenance', 'Mantenimiento'), ('calibration', 'Calibración')]
+
+    type = models.CharField(max_length=20, choices=TYPE_CHOICES)
+    date = models.DateField()
+
+    class Meta:
+        indexes = [models.Index(fields=['equipo', 'timestamp'], name='equipo_maint_eq_ts_idx')]
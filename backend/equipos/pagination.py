@@ -0,0 +1,93 @@
+from django.db.models import CharField, F, IntegerField, Value
+from django.db.models.functions import Coalesce
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class EquiposCursorPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) para el listado de equipos.
+
+    Es opcional: solo se activa cuando el cliente envía ``cursor`` o
+    ``page_size``. Sin esos parámetros el endpoint sigue devolviendo la lista
+    completa, como espera el frontend actual.
+
+    DRF ubica el cursor con el valor de la primera columna del orden, que
+    debe ser única y no nula. Con ``?ordering=`` sobre otra columna (códigos,
+    sede, servicio, responsable) se ordena por ``cursor_key``, el valor de esa
+    columna (el id en las relaciones) sin NULL, y el id desempata.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = 'id'
+    cursor_key = 'cursor_key'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return self.paginate_keyset(queryset, request, view)
+
+    def paginate_keyset(self, queryset, request, view=None):
+        first = CursorPagination.get_ordering(self, request, queryset, view)[0].lstrip('-')
+        if first not in ('id', 'pk'):
+            field = queryset.model._meta.get_field(first)
+            key = F(field.attname)
+            if field.null:
+                # Los NULL quedan primero (últimos en orden descendente) en todos los motores
+                key = (
+                    Coalesce(field.attname, Value(0), output_field=IntegerField()) if field.is_relation
+                    else Coalesce(field.attname, Value(''), output_field=CharField())
+                )
+            # annotate (no alias): DRF lee la posición del cursor de cada fila
+            queryset = queryset.annotate(**{self.cursor_key: key})
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering[0].lstrip('-') in ('id', 'pk'):
+            return ordering[:1]
+        direction = '-' if ordering[0].startswith('-') else ''
+        rest = [o for o in ordering[1:] if o.lstrip('-') not in ('id', 'pk')]
+        return (f'{direction}{self.cursor_key}', *rest, f'{direction}id')
+
+
+class BootstrapEquiposPagination(EquiposCursorPagination):
+    """
+    Primera página del listado compacto dentro de ``/api/bootstrap/``. Siempre
+    pagina, y el enlace ``next`` sigue en ``/api/equipos/?compact=1`` (relativo,
+    porque la respuesta se guarda en caché).
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = self.paginate_keyset(queryset, request, view)
+        self.base_url = '/api/equipos/?compact=1'
+        if self.page_size_query_param in request.query_params:
+            self.base_url = replace_query_param(self.base_url, self.page_size_query_param, self.page_size)
+        return page
+
+
+class MaintenanceEventsPagination(LimitOffsetPagination):
+    """
+    Paginación del calendario de mantenimientos. Sin ``limit`` en la URL no se
+    pagina (``default_limit`` es None) y se devuelve la lista completa.
+    """
+    max_limit = 500
+
+
+class HistoryPagination(CursorPagination):
+    """
+    Historiales de un equipo, del más reciente al más antiguo. Siempre
+    paginados: el cursor recorre el índice (equipo, timestamp) sin OFFSET.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = '-timestamp'
+
+
+class SearchPagination(LimitOffsetPagination):
+    """Resultados de la búsqueda, siempre paginados (20 por defecto)."""
+    default_limit = 20
+    max_limit = 200
@@ -0,0 +1,190 @@
+"""
+Etapas de parseo y validación de la hoja F-147.
+
+Este módulo no depende del ORM para que los lotes de filas puedan procesarse
+en otros procesos (``parse_batch``); la escritura queda en ``importer``.
+"""
+from datetime import datetime
+
+# Columnas del formato F-147 (inventario de equipos biomédicos, industriales y
+# gases): (campo del modelo, encabezado en la hoja, tipo de valor).
+# Tipos: 'str' (vacío -> None), 'required_str' (vacío -> ''), 'date', 'bool', 'int'.
+# Salvo en 'required_str', una celda vacía se parsea como None.
+F147_COLUMNS = [
+    ('inventory_code', 'Código de inventario interno del laboratorio y/o asignado por UdeA', 'str'),
+    ('name', 'Nombre del equipo', 'str'),
+    ('brand', 'Marca', 'str'),
+    ('model', 'Modelo', 'str'),
+    ('serial', 'Serie', 'str'),
+    ('ips_code', 'Código IPS', 'str'),
+    ('ecri_code', 'Código ECRI', 'required_str'),
+    ('physical_location', 'Ubicación física', 'str'),
+    ('misional_classification', 'Clasificación según eje misional (Docencia y/o Investigación y/o Extensión)', 'str'),
+    ('ips_classification', 'Clasificación IPS (IND-BIO-Gases)', 'str'),
+    ('risk_classification', 'Clasificación por riesgo', 'str'),
+    ('invima_record', 'Registro Invima/Permiso comercialización/No Requiere', 'str'),
+    ('acquisition_date', 'Antigüedad del eq. (F. adquisición)', 'date'),
+    ('owner', 'Propietario del equipo', 'str'),
+    ('fabrication_date', 'Fecha de fabricación', 'date'),
+    ('nit', 'NIT', 'str'),
+    ('provider', 'Proveedor equipo', 'str'),
+    ('in_warranty', 'Está en garantía (Si/No)', 'bool'),
+    ('warranty_end_date', 'Fecha finalización garantía', 'date'),
+    ('acquisition_method', 'Forma de adquisición', 'str'),
+    ('document_type', 'Tipo de documento', 'str'),
+    ('document_number', 'Número de documento', 'str'),
+    ('purchase_value', 'Valor de compra', 'str'),
+    ('has_life_sheet', 'Hoja de vida', 'bool'),
+    ('has_import_registration', 'Registro de importación', 'bool'),
+    ('has_operation_manual', 'Manual operación (Esp)', 'bool'),
+    ('has_maintenance_manual', 'Manual servicio mto (Esp)', 'bool'),
+    ('has_quick_guide', 'Guía Rápida de uso', 'bool'),
+    ('has_instruction_manual', 'Instructivo de manejo rápido de equipos', 'bool'),
+    ('has_maintenance_protocol', 'Protocolo Mto Prev.', 'bool'),
+    ('metrology_frequency', 'Frecuencia metrológica fabricante', 'str'),
+    ('maintenance_required', 'Mantenimiento Si/No', 'bool'),
+    ('maintenance_frequency', 'Frecuencia anual mantenimiento', 'int'),
+    ('calibration_required', 'Calibración Si/No', 'bool'),
+    ('calibration_frequency', 'Frecuencia anual calibración', 'int'),
+    ('magnitude', 'Magnitud', 'str'),
+    ('measurement_range', 'Rango del equipo', 'str'),
+    ('resolution', 'Resolución', 'str'),
+    ('work_range', 'Rango de trabajo', 'str'),
+    ('max_permitted_error', 'Error máximo permitido', 'str'),
+    ('voltage', 'Voltaje', 'str'),
+    ('current', 'Corriente', 'str'),
+    ('relative_humidity', 'Humedad relativa', 'str'),
+    ('operating_temperature', 'Temperatura', 'str'),
+    ('dimensions', 'Dimensiones', 'str'),
+    ('weight', 'Peso', 'str'),
+    ('others', 'Otros', 'str'),
+]
+
+# Columnas que se resuelven contra las tablas de referencia
+SEDE_HEADER = 'Sede'
+SERVICIO_HEADER = 'Proceso'
+RESPONSABLE_HEADER = 'Responsable del proceso en el que interviene el equipo y/o inventario UdeA'
+
+
+
+# Formatos de fecha aceptados, en orden de prioridad. No se solapan entre sí
+# (%Y exige cuatro dígitos y %y dos), así que recordar el último que funcionó
+# en cada columna no cambia el resultado, solo evita intentos fallidos.
+DATE_FORMATS = (
+    '%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y', '%d-%m-%y',
+    '%d/%m/%Y (%H:%M)', '%d/%m/%Y (%H:%M:%S)', '%Y-%m-%d',
+)
+
+
+class DateParser:
+    """Parser de fechas de una columna que recuerda el formato detectado."""
+
+    def __init__(self):
+        self.format = None
+
+    def __call__(self, val):
+        val = val.strip()
+        if self.format is not None:
+            try:
+                return datetime.strptime(val, self.format).date()
+            except ValueError:
+                pass
+        for fmt in DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(val, fmt).date()
+            except ValueError:
+                continue
+            self.format = fmt
+            return parsed
+        raise ValueError(f'fecha no reconocida: {val!r}')
+
+
+# Utilidades para parsear fechas y booleanos
+
+def parse_date(val):
+    try:
+        return DateParser()(val)
+    except ValueError:
+        return None
+
+def parse_bool(val):
+    if not val:
+        return False
+    return str(val).strip().lower() in ['si', 'sí', 'yes', 'true', '1']
+
+def parse_int(val):
+    return int(val) if val and val.isdigit() else None
+
+
+def clean(val):
+    return val.strip() if val else None
+
+
+class RowParser:
+    """
+    Convierte filas de la hoja en valores del modelo y reporta los errores de
+    cada fila. Guarda un ``DateParser`` por columna de fecha.
+
+    ``max_lengths`` (campo -> longitud máxima) permite validar el largo de los
+    textos sin consultar el modelo.
+    """
+
+    def __init__(self, max_lengths=None):
+        self.max_lengths = max_lengths or {}
+        self.date_parsers = {field: DateParser() for field, _, kind in F147_COLUMNS if kind == 'date'}
+
+    def parse(self, row):
+        values, errors = {}, []
+        for field, header, kind in F147_COLUMNS:
+            raw = row.get(header)
+            if kind == 'str':
+                values[field] = raw or None
+            elif kind == 'required_str':
+                values[field] = raw or ''
+            elif kind == 'date':
+                values[field] = None
+                if raw and raw.strip():
+                    try:
+                        values[field] = self.date_parsers[field](raw)
+                    except ValueError as exc:
+                        errors.append(f'{header}: {exc}')
+            elif kind == 'bool':
+                values[field] = parse_bool(raw) if raw and raw.strip() else None
+            else:
+                raw = (raw or '').strip()
+                values[field] = int(raw) if raw.isdigit() else None
+                if raw and not raw.isdigit():
+                    errors.append(f'{header}: número no válido: {raw!r}')
+
+            max_length = self.max_lengths.get(field)
+            if max_length and isinstance(values[field], str) and len(values[field]) > max_length:
+                errors.append(f'{header}: supera los {max_length} caracteres')
+        # useful_life no está en la hoja: se deja sin tocar
+        relations = {
+            'site': clean(row.get(SEDE_HEADER)),
+            'service': clean(row.get(SERVICIO_HEADER)),
+            'responsible': clean(row.get(RESPONSABLE_HEADER)),
+        }
+        return values, relations, errors
+
+
+def parse_row(row):
+    """Convierte una fila de la hoja F-147 en un dict de campos del modelo."""
+    return RowParser().parse(row)[0]
+
+
+_process_parser = None
+
+
+def parse_batch(first_row, rows, max_lengths):
+    """
+    Parsea y valida un lote de filas numeradas desde ``first_row``.
+
+    Es la unidad de trabajo que se envía al pool de procesos; cada proceso
+    conserva su ``RowParser`` (y los formatos de fecha detectados) entre lotes.
+    Devuelve tuplas ``(número de fila, valores, relaciones, errores)``.
+    """
+    global _process_parser
+    if _process_parser is None or _process_parser.max_lengths != max_lengths:
+        _process_parser = RowParser(max_lengths)
+    return [(first_row + i, *_process_parser.parse(row)) for i, row in enumerate(rows)]
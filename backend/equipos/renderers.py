@@ -0,0 +1,23 @@
+from rest_framework.renderers import BaseRenderer
+
+
+class PassthroughRenderer(BaseRenderer):
+    """
+    Renderer que no transforma nada: la vista ya devuelve el archivo como
+    respuesta HTTP (p. ej. un ``StreamingHttpResponse``). Sirve para que DRF
+    acepte ``?format=csv`` / ``?format=xlsx`` y el encabezado ``Accept``.
+    """
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class CSVPassthroughRenderer(PassthroughRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class XLSXPassthroughRenderer(PassthroughRenderer):
+    media_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    format = 'xlsx'
@@ -0,0 +1,194 @@
+"""
+Búsqueda de texto completo sobre equipos.
+
+- SQLite: tabla virtual FTS5 ``equipos_search`` (rowid = id del equipo),
+  mantenida por triggers sobre ``equipos_equipos``, así que también la
+  actualizan ``bulk_create``, ``bulk_update`` y ``QuerySet.update``.
+- PostgreSQL: índice GIN sobre ``to_tsvector('simple', ...)`` de las mismas
+  columnas; la consulta repite exactamente esa expresión para usarlo.
+- Otros motores: ``icontains`` sin índice.
+
+``fuzzy_search`` tolera errores de tipeo comparando trigramas de las claves
+normalizadas (``name_key``, ``brand_key``, ``provider_key``): en SQLite con
+una tabla FTS5 ``trigram`` que preselecciona candidatos, en PostgreSQL con
+``word_similarity`` de pg_trgm y sus índices GIN. No hay alternativa sin
+índice para otros motores.
+
+Las tablas, índices y triggers se crean en las migraciones 0011 y 0012. En
+SQLite, las migraciones que reconstruyen ``equipos_equipos`` (p. ej. al
+agregar una columna) eliminan sus triggers; ``ensure_sqlite_triggers`` los
+vuelve a crear después de cada ``migrate``.
+"""
+import re
+from django.db import connection, connections
+from django.db.models import FloatField, Q, Value
+from backend_lime.text import search_key, word_similarity
+
+# Columnas indexadas (mismo orden que en la tabla FTS5)
+SEARCH_COLUMNS = (
+    'name', 'brand', 'model', 'serial', 'inventory_code', 'ips_code', 'ecri_code', 'provider', 'physical_location',
+)
+
+# Debe coincidir con la expresión del índice creado en la migración
+POSTGRES_DOCUMENT = "to_tsvector('simple', {})".format(
+    " || ' ' || ".join(f'coalesce("equipos_equipos"."{column}", \'\')' for column in SEARCH_COLUMNS)
+)
+
+# Claves normalizadas que usa la búsqueda aproximada
+KEY_COLUMNS = ('name_key', 'brand_key', 'provider_key')
+
+# Igual al pg_trgm.word_similarity_threshold por defecto
+FUZZY_THRESHOLD = 0.6
+# Candidatos que el índice de trigramas entrega para puntuar
+FUZZY_CANDIDATES = 200
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Triggers que mantienen las tablas FTS5 de SQLite: tabla -> columnas
+SQLITE_INDEXES = {
+    'equipos_search': SEARCH_COLUMNS,
+    'equipos_fuzzy': KEY_COLUMNS,
+}
+
+
+def _sqlite_triggers(table, columns):
+    names = ', '.join(columns)
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_insert AFTER INSERT ON equipos_equipos BEGIN
+            INSERT INTO {table} (rowid, {names}) VALUES (new.id, {', '.join(f'new.{c}' for c in columns)});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_delete AFTER DELETE ON equipos_equipos BEGIN
+            DELETE FROM {table} WHERE rowid = old.id;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_update AFTER UPDATE OF {names} ON equipos_equipos BEGIN
+            UPDATE {table} SET {', '.join(f'{c} = new.{c}' for c in columns)} WHERE rowid = old.id;
+        END
+        """,
+    ]
+
+
+def ensure_sqlite_triggers(using='default'):
+    """Crea los triggers de las tablas FTS5 que existan y les falten."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        tables = set(connection.introspection.table_names(cursor))
+        for table, columns in SQLITE_INDEXES.items():
+            if table in tables and 'equipos_equipos' in tables:
+                for sql in _sqlite_triggers(table, columns):
+                    cursor.execute(sql)
+
+
+def _terms(text):
+    """
+    Términos de la búsqueda: cada palabra, partida en sus fragmentos
+    alfanuméricos (``INV-001`` → ``inv``, ``001``), como lo hace el tokenizador.
+    """
+    terms = []
+    for word in text.split():
+        parts = [part.lower() for part in _TOKEN_RE.findall(word)]
+        if parts:
+            terms.append(parts)
+    return terms
+
+
+def _fts5_query(terms):
+    # Cada palabra es una frase con prefijo: "inv 00"* encuentra INV-001.
+    return ' '.join('"{}"*'.format(' '.join(parts)) for parts in terms)
+
+
+def _tsquery(terms):
+    # Palabras con guion se buscan como frase (<->); todas con prefijo.
+    return ' & '.join('({})'.format(' <-> '.join(f'{part}:*' for part in parts)) for parts in terms)
+
+
+def search(queryset, text):
+    """
+    Filtra ``queryset`` por ``text`` y lo ordena por relevancia. Cada equipo
+    trae ``search_rank`` (menor es más relevante). Un texto sin palabras
+    devuelve el queryset vacío.
+    """
+    terms = _terms(text or '')
+    if not terms:
+        return queryset.none()
+
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        # El JOIN deja que FTS5 resuelva el MATCH con su índice.
+        return queryset.extra(
+            select={'search_rank': 'equipos_search.rank'},
+            tables=['equipos_search'],
+            where=['equipos_search.rowid = equipos_equipos.id', 'equipos_search MATCH %s'],
+            params=[_fts5_query(terms)],
+        ).order_by('search_rank', 'id')
+
+    if vendor == 'postgresql':
+        tsquery = _tsquery(terms)
+        return queryset.extra(
+            select={'search_rank': f"-ts_rank({POSTGRES_DOCUMENT}, to_tsquery('simple', %s))"},
+            select_params=[tsquery],
+            where=[f"{POSTGRES_DOCUMENT} @@ to_tsquery('simple', %s)"],
+            params=[tsquery],
+        ).order_by('search_rank', 'id')
+
+    condition = Q()
+    for parts in terms:
+        word = Q()
+        for column in SEARCH_COLUMNS:
+            word |= Q(**{f'{column}__icontains': '-'.join(parts)})
+        condition &= word
+    return queryset.filter(condition).annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    ).order_by('id')
+
+
+def fuzzy_search(queryset, text):
+    """
+    Búsqueda aproximada: equipos cuyo nombre, marca o proveedor se parece a
+    ``text`` aunque tenga tildes distintas o errores de tipeo
+    ("calibarcion" → "Calibración"). Devuelve los equipos ordenados por
+    similitud, cada uno con ``search_rank`` (menor es más parecido). El
+    ``queryset`` debe cargar las columnas de ``KEY_COLUMNS``.
+    """
+    key = search_key(text)
+    words = [word for word in _TOKEN_RE.findall(key) if len(word) >= 3]
+    if not words:
+        return queryset.none()
+
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        # El índice de trigramas preselecciona los equipos que comparten
+        # alguno; solo esos candidatos se puntúan en Python.
+        grams = {word[i:i + 3] for word in words for i in range(len(word) - 2)}
+        candidates = queryset.extra(
+            select={'search_rank': 'equipos_fuzzy.rank'},
+            tables=['equipos_fuzzy'],
+            where=['equipos_fuzzy.rowid = equipos_equipos.id', 'equipos_fuzzy MATCH %s'],
+            params=[' OR '.join(f'"{gram}"' for gram in sorted(grams))],
+        ).order_by('search_rank')[:FUZZY_CANDIDATES]
+        results = []
+        for equipo in candidates:
+            score = max(word_similarity(key, getattr(equipo, column)) for column in KEY_COLUMNS)
+            if score >= FUZZY_THRESHOLD:
+                equipo.search_rank = -score
+                results.append(equipo)
+        results.sort(key=lambda equipo: (equipo.search_rank, equipo.pk))
+        return results
+
+    # PostgreSQL (settings no admite otros motores)
+    columns = [f'"equipos_equipos"."{column}"' for column in KEY_COLUMNS]
+    return queryset.extra(
+        select={'search_rank': '-greatest({})'.format(
+            ', '.join(f'word_similarity(%s, {column})' for column in columns)
+        )},
+        select_params=[key] * len(columns),
+        # <% usa los índices GIN gin_trgm_ops de cada clave
+        where=['({})'.format(' OR '.join(f'%s <%% {column}' for column in columns))],
+        params=[key] * len(columns),
+    ).order_by('search_rank', 'id')
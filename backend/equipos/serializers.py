@@ -1,10 +1,213 @@
 from rest_framework import serializers
-from .models import Equipos
+from rest_framework.validators import UniqueValidator
+from .bulk import create_equipos, update_equipos
+from .models import Equipos, EquipoDecommission, EquipoMaintenanceRecord, EquipoTransfer
 from responsables.serializers import ResponsablesSerializer
 from sedes.serializers import SedesSerializer
 from servicios.serializers import ServiciosSerializer
 
-class EquiposSerializer(serializers.ModelSerializer):
+
+class DynamicFieldsMixin:
+    """
+    Permite recortar la representación desde la URL:
+    ``?fields=id,name,status`` deja solo esos campos y ``?omit=full`` los quita.
+
+    Los campos descartados no se calculan, así que omitir ``full`` o los
+    ``*_details`` también ahorra el trabajo de serializarlos.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+
+        fields = self._param_list(request, 'fields')
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in self._param_list(request, 'omit'):
+            self.fields.pop(name, None)
+
+    @staticmethod
+    def _param_list(request, param):
+        return [f.strip() for f in request.query_params.get(param, '').split(',') if f.strip()]
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Igual que PrimaryKeyRelatedField, pero toma el objeto de
+    ``context['preloaded'][field_name]`` cuando la operación masiva ya cargó
+    todas las relaciones del lote.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(self.field_name)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            obj = preloaded.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
+
+
+def _differs(equipo, field_name, value):
+    """Compara un valor validado con el del equipo sin cargar las relaciones."""
+    field = Equipos._meta.get_field(field_name)
+    if field.many_to_one:
+        return getattr(equipo, field.attname) != (value.pk if value is not None else None)
+    return getattr(equipo, field_name) != value
+
+
+def _related_ids(items, field_name):
+    ids = set()
+    for item in items:
+        value = item.get(field_name) if isinstance(item, dict) else None
+        if isinstance(value, bool):
+            continue
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            pass
+    return ids
+
+
+class EquiposBulkSerializer(serializers.ListSerializer):
+    """
+    Alta y edición masiva de equipos (``/api/equipos/bulk/``).
+
+    La validación es por lote: las relaciones se cargan con una consulta por
+    modelo y la unicidad de los códigos se comprueba con una sola consulta,
+    en lugar de una por ítem. Se escribe con ``bulk_create`` / ``bulk_update``.
+
+    Para editar, ``instance`` es la lista de equipos y cada ítem trae su
+    ``id``. Con ``context['allow_partial']`` los ítems inválidos se descartan
+    y sus errores quedan en ``item_errors`` (mismo orden que la entrada); sin
+    él, cualquier error invalida todo el lote.
+    """
+    unique_fields = ('inventory_code', 'ips_code')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.item_errors = []
+        self.targets = []
+
+    def _prepare(self, data):
+        fields = self.child.fields
+        preloaded = {}
+        for name, field in fields.items():
+            if isinstance(field, PreloadedPrimaryKeyRelatedField) and not field.read_only:
+                preloaded[name] = field.get_queryset().in_bulk(_related_ids(data, name))
+        self.context['preloaded'] = preloaded
+        for name in self.unique_fields:
+            if name in fields:
+                fields[name].validators = [
+                    v for v in fields[name].validators if not isinstance(v, UniqueValidator)
+                ]
+        self._instances = {}
+        if self.instance is not None:
+            self._instances = {equipo.pk: equipo for equipo in self.instance}
+
+    def run_child_validation(self, data):
+        if self.instance is not None:
+            try:
+                pk = int(data.get('id'))
+            except (AttributeError, TypeError, ValueError):
+                raise serializers.ValidationError({'id': ['Cada ítem debe incluir el id del equipo.']})
+            if pk in self._seen:
+                raise serializers.ValidationError({'id': ['El equipo está repetido en la lista.']})
+            self._seen.add(pk)
+            instance = self._instances.get(pk)
+            if instance is None:
+                raise serializers.ValidationError({'id': ['Equipo no encontrado.']})
+            self.child.instance = instance
+            self.child.initial_data = data
+        return super().run_child_validation(data)
+
+    def _check_unique(self, validated, errors):
+        for name in self.unique_fields:
+            codes = {}
+            for index, attrs in enumerate(validated):
+                if attrs is None or not attrs.get(name):
+                    continue
+                if attrs[name] in codes:
+                    errors[index].setdefault(name, []).append('El código está repetido en la lista.')
+                else:
+                    codes[attrs[name]] = index
+            if not codes:
+                continue
+            existing = Equipos.objects.filter(**{f'{name}__in': codes}).values_list(name, 'pk')
+            for code, pk in existing:
+                index = codes[code]
+                target = self.targets[index]
+                if target is None or target.pk != pk:
+                    errors[index].setdefault(name, []).append('Ya existe un equipo con este código.')
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+        self._prepare(data)
+        self._seen = set()
+
+        validated, errors, self.targets = [], [], []
+        for item in data:
+            try:
+                attrs = self.run_child_validation(item)
+            except serializers.ValidationError as exc:
+                validated.append(None)
+                errors.append(dict(exc.detail) if isinstance(exc.detail, dict) else {'non_field_errors': exc.detail})
+                self.targets.append(None)
+            else:
+                validated.append(attrs)
+                errors.append({})
+                self.targets.append(self.child.instance if self.instance is not None else None)
+        self.child.instance = None
+        self._check_unique(validated, errors)
+
+        self.item_errors = errors
+        if any(errors) and not self.context.get('allow_partial'):
+            raise serializers.ValidationError(errors)
+        self.targets = [t for t, e in zip(self.targets, errors) if not e]
+        return [attrs for attrs, e in zip(validated, errors) if not e]
+
+    def create(self, validated_data):
+        return create_equipos([Equipos(**attrs) for attrs in validated_data])
+
+    def update(self, instance, validated_data):
+        changes = []
+        for equipo, attrs in zip(self.targets, validated_data):
+            changed = {f for f, v in attrs.items() if _differs(equipo, f, v)}
+            for field in changed:
+                setattr(equipo, field, attrs[field])
+            changes.append((equipo, changed))
+        update_equipos(changes)
+        return self.targets
+
+
+class EquiposListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Representación compacta (nivel tarjeta) para el listado del Dashboard."""
+    display = serializers.CharField(source='__str__', read_only=True)
+
+    class Meta:
+        model = Equipos
+        fields = [
+            'id', 'inventory_code', 'name', 'brand', 'model', 'serial', 'status',
+            'site', 'service', 'responsible', 'ips_code',
+            'maintenance_required', 'last_maintenance_date',
+            'calibration_required', 'last_calibration_date',
+            'next_maintenance_date', 'next_calibration_date', 'display',
+        ]
+        read_only_fields = fields
+
+
+class EquiposSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     # Provide safe defaults for fields that are non-null at DB level so
     # serializers won't accidentally pass `None` (which would cause a DB
     # integrity error). These defaults avoid server 500 errors when the
@@ -45,12 +248,14 @@ class EquiposSerializer(serializers.ModelSerializer):
             'has_life_sheet', 'has_import_registration', 'has_operation_manual', 'has_maintenance_manual',
             'has_quick_guide', 'has_instruction_manual', 'has_maintenance_protocol',
             'metrology_frequency', 'maintenance_required', 'maintenance_frequency', 'last_maintenance_date',
-            'calibration_required', 'calibration_frequency', 'last_calibration_date', 'magnitude', 'measurement_range', 'resolution',
+            'calibration_required', 'calibration_frequency', 'last_calibration_date',
+            'next_maintenance_date', 'next_calibration_date', 'magnitude', 'measurement_range', 'resolution',
             'work_range', 'max_permitted_error', 'voltage', 'current', 'relative_humidity',
             'operating_temperature', 'dimensions', 'weight', 'others',
-            'site_details', 'service_details', 'responsible_details', 'display', 'full'
+            'updated_at', 'site_details', 'service_details', 'responsible_details', 'display', 'full'
         ]
-        read_only_fields = ['id', 'display', 'full']
+        read_only_fields = ['id', 'display', 'full', 'next_maintenance_date', 'next_calibration_date', 'updated_at']
+        list_serializer_class = EquiposBulkSerializer
         extra_kwargs = {
             # accept partial payloads from the frontend; DB-level integrity still applies
             'ecri_code': {'required': False, 'allow_blank': True},  # Permitir vacío, se generará automáticamente si falta
@@ -104,8 +309,11 @@ class EquiposSerializer(serializers.ModelSerializer):
     
     def validate(self, data):
         """Validación personalizada para asegurar campos requeridos"""
+        # En un PATCH solo se completan los campos que vienen en el payload
+        creating = not self.partial
+
         # Si ecri_code está vacío, generar uno automáticamente
-        if not data.get('ecri_code') or (isinstance(data.get('ecri_code'), str) and not data.get('ecri_code').strip()):
+        if (creating or 'ecri_code' in data) and (not data.get('ecri_code') or (isinstance(data.get('ecri_code'), str) and not data.get('ecri_code').strip())):
             inventory_code = data.get('inventory_code', '')
             if inventory_code:
                 data['ecri_code'] = f'ECRI-{inventory_code}'
@@ -116,9 +324,8 @@ class EquiposSerializer(serializers.ModelSerializer):
         
         # Si responsible es None o 0, usar el primer responsable disponible
         responsible = data.get('responsible')
-        if not responsible:
-            from responsables.models import Responsable
-            first_responsible = Responsable.objects.first()
+        if not responsible and (creating or 'responsible' in data):
+            first_responsible = self._first_responsible()
             if first_responsible:
                 # Asignar la instancia directamente, no el ID
                 data['responsible'] = first_responsible
@@ -138,4 +345,37 @@ class EquiposSerializer(serializers.ModelSerializer):
                 })
         # Si ya es una instancia, dejarlo como está
         
-        return data
\ No newline at end of file
+        return data
+
+    def _first_responsible(self):
+        # Se guarda en el contexto para no repetir la consulta en cada ítem de un lote
+        if 'first_responsible' not in self.context:
+            from responsables.models import Responsable
+            self.context['first_responsible'] = Responsable.objects.first()
+        return self.context['first_responsible']
+
+
+class EquipoTransferSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EquipoTransfer
+        fields = [
+            'id', 'equipo', 'inventory_code', 'timestamp', 'date',
+            'from_site', 'from_service', 'from_responsible',
+            'to_site', 'to_service', 'to_responsible',
+            'justification', 'signature', 'user',
+        ]
+        read_only_fields = fields
+
+
+class EquipoDecommissionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EquipoDecommission
+        fields = ['id', 'equipo', 'inventory_code', 'timestamp', 'date', 'reason', 'user']
+        read_only_fields = fields
+
+
+class EquipoMaintenanceRecordSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EquipoMaintenanceRecord
+        fields = ['id', 'equipo', 'inventory_code', 'timestamp', 'type', 'date', 'user']
+        read_only_fields = fields
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_migrate
+from django.dispatch import receiver
+from .models import Equipos, EquipoTombstone
+from .search import ensure_sqlite_triggers
+
+
+@receiver(post_delete, sender=Equipos)
+def record_tombstone(sender, instance, **kwargs):
+    """Deja constancia del borrado para la sincronización incremental."""
+    EquipoTombstone.objects.create(equipo_id=instance.pk, inventory_code=instance.inventory_code)
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    """SQLite borra los triggers de búsqueda al reconstruir la tabla de equipos."""
+    if sender.name == 'equipos':
+        ensure_sqlite_triggers(using)
@@ -1,3 +1,982 @@
-from django.test import TestCase
+from datetime import date
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache, caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from responsables.models import Responsable
+from sedes.models import Sede
+from servicios.models import Servicio
+from users.permissions import get_user_role
+from .bulk import BULK_MAX_ITEMS
+from .models import Equipos, EquipoDecommission
 
-# Create your tests here.
+
+class EquiposAPITestCase(TestCase):
+    """Datos base compartidos por las pruebas del API de equipos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        admin_group, _ = Group.objects.get_or_create(name='Administrador')
+        cls.admin = User.objects.create_user(username='admin', password='x')
+        cls.admin.groups.add(admin_group)
+        cls.sede = Sede.objects.create(nombre_sede='Sede Norte')
+        cls.otra_sede = Sede.objects.create(nombre_sede='Sede Sur')
+        cls.servicio = Servicio.objects.create(nombre='Laboratorio', sede=cls.sede)
+        cls.responsable = Responsable.objects.create(name='Ana', role='Coordinadora')
+        for i in range(6):
+            Equipos.objects.create(
+                inventory_code=f'INV-{i:03d}',
+                name=f'Centrífuga {i}',
+                brand='Thermo' if i % 2 else 'Eppendorf',
+                status='Activo' if i < 4 else 'Inactivo',
+                site=cls.sede if i < 3 else cls.otra_sede,
+                service=cls.servicio,
+                ecri_code=f'ECRI-{i}',
+                responsible=cls.responsable,
+            )
+
+    def setUp(self):
+        cache.clear()
+        caches['reference'].clear()
+        # El rol ya está en la caché 'roles', como tras la primera petición
+        get_user_role(User.objects.get(pk=self.admin.pk))
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+
+class EquiposListTests(EquiposAPITestCase):
+
+    def test_list_without_pagination_params_returns_plain_list(self):
+        res = self.client.get('/api/equipos/')
+        self.assertEqual(res.status_code, 200)
+        self.assertIsInstance(res.data, list)
+        self.assertEqual(len(res.data), 6)
+
+    def test_filters_by_status_site_and_brand(self):
+        res = self.client.get('/api/equipos/', {
+            'status': 'Activo', 'site': self.sede.id, 'brand': 'thermo',
+        })
+        self.assertEqual([e['inventory_code'] for e in res.data], ['INV-001'])
+
+    def test_search_and_ordering(self):
+        res = self.client.get('/api/equipos/', {'search': 'INV-00', 'ordering': '-inventory_code'})
+        self.assertEqual(res.data[0]['inventory_code'], 'INV-005')
+
+    def test_cursor_pagination_walks_every_row_once(self):
+        seen = []
+        url, params = '/api/equipos/', {'page_size': 4}
+        while url:
+            res = self.client.get(url, params)
+            seen.extend(e['id'] for e in res.data['results'])
+            url, params = res.data['next'], None
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(len(set(seen)), 6)
+
+    def test_cursor_pagination_over_duplicate_and_null_values(self):
+        for i in range(2):
+            Equipos.objects.create(inventory_code=None, ips_code=f'IPS-{i}', responsible=self.responsable)
+        by_site = sorted(Equipos.objects.values_list('site_id', 'id'), key=lambda r: (r[0] or 0, r[1]))
+        by_code = sorted(Equipos.objects.values_list('inventory_code', 'id'), key=lambda r: (r[0] or '', r[1]))
+        cases = [
+            ('site', [pk for _, pk in by_site]),
+            ('-site', [pk for _, pk in reversed(by_site)]),
+            ('inventory_code', [pk for _, pk in by_code]),
+        ]
+        for ordering, expected in cases:
+            for compact in ('', '1'):
+                seen = []
+                url, params = '/api/equipos/', {'page_size': 2, 'ordering': ordering, 'compact': compact}
+                while url:
+                    res = self.client.get(url, params)
+                    seen.extend(e['id'] for e in res.data['results'])
+                    url, params = res.data['next'], None
+                self.assertEqual(seen, expected, (ordering, compact))
+
+
+class EquiposQueryCountTests(EquiposAPITestCase):
+    """
+    El listado y el detalle no deben crecer en consultas con el número de
+    filas: la agregación del validador del ETag más la de los datos.
+    """
+
+    def test_list_query_count_is_constant(self):
+        with self.assertNumQueries(2):
+            res = self.client.get('/api/equipos/')
+        self.assertEqual(len(res.data), 6)
+
+        for i in range(6, 20):
+            Equipos.objects.create(
+                inventory_code=f'INV-{i:03d}', site=self.otra_sede, service=self.servicio,
+                ecri_code=f'ECRI-{i}', responsible=self.responsable,
+            )
+        with self.assertNumQueries(2):
+            res = self.client.get('/api/equipos/')
+        self.assertEqual(len(res.data), 20)
+        self.assertEqual(res.data[-1]['full']['site'], 'Sede Sur')
+
+    def test_detail_query_count(self):
+        equipo = Equipos.objects.first()
+        with self.assertNumQueries(2):
+            self.client.get(f'/api/equipos/{equipo.id}/')
+
+
+class ConditionalGetTests(EquiposAPITestCase):
+
+    def assertRevalidates(self, url, change):
+        res = self.client.get(url)
+        etag = res['ETag']
+        # Solo la agregación sobre equipos; las tablas de referencia usan su versión en caché
+        with self.assertNumQueries(1):
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached['ETag'], etag)
+        change()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_list_and_detail_revalidate_on_equipo_change(self):
+        equipo = Equipos.objects.get(inventory_code='INV-000')
+
+        def rename():
+            equipo.name = 'Otro nombre'
+            equipo.save(update_fields=['name'])
+
+        self.assertRevalidates('/api/equipos/', rename)
+        self.assertRevalidates(f'/api/equipos/{equipo.id}/', lambda: Equipos.objects.create(
+            inventory_code='INV-100', responsible=self.responsable,
+        ))
+
+    def test_related_rename_and_query_params_change_etag(self):
+        def rename_sede():
+            self.sede.nombre_sede = 'Sede Centro'
+            self.sede.save()
+
+        self.assertRevalidates('/api/equipos/', rename_sede)
+        a = self.client.get('/api/equipos/', {'status': 'Activo'})['ETag']
+        b = self.client.get('/api/equipos/', {'status': 'Inactivo'})['ETag']
+        self.assertNotEqual(a, b)
+
+    def test_maintenance_events_and_reference_tables(self):
+        equipo = Equipos.objects.get(inventory_code='INV-000')
+
+        def schedule():
+            equipo.maintenance_required = True
+            equipo.maintenance_frequency = 3
+            equipo.save()
+
+        self.assertRevalidates('/api/equipos/maintenance-events/', schedule)
+        res = self.client.get('/api/sedes/')
+        cached = self.client.get('/api/sedes/', HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+
+class EquiposChangesTests(EquiposAPITestCase):
+
+    @override_settings(SYNC_CURSOR_OVERLAP_SECONDS=0)
+    def test_changes_since_cursor(self):
+        res = self.client.get('/api/equipos/changes/')
+        self.assertEqual(len(res.data['updated']), 6)
+        self.assertEqual(res.data['deleted'], [])
+        cursor = res.data['cursor']
+
+        res = self.client.get('/api/equipos/changes/', {'since': cursor})
+        self.assertEqual(res.data['updated'], [])
+
+        changed = Equipos.objects.get(inventory_code='INV-001')
+        changed.last_maintenance_date = '2025-01-15'
+        changed.save(update_fields=['last_maintenance_date'])
+        deleted_id = Equipos.objects.get(inventory_code='INV-002').id
+        Equipos.objects.get(pk=deleted_id).delete()
+        created = Equipos.objects.create(inventory_code='INV-100', responsible=self.responsable)
+
+        res = self.client.get('/api/equipos/changes/', {'since': cursor, 'compact': '1'})
+        self.assertEqual([e['id'] for e in res.data['updated']], [changed.id, created.id])
+        self.assertNotIn('full', res.data['updated'][0])
+        self.assertEqual(res.data['deleted'], [deleted_id])
+
+        res = self.client.get('/api/equipos/changes/', {'since': res.data['cursor']})
+        self.assertEqual((res.data['updated'], res.data['deleted']), ([], []))
+
+    def test_bulk_writes_and_cascades_are_tracked(self):
+        cursor = self.client.get('/api/equipos/changes/').data['cursor']
+        Equipos.objects.filter(inventory_code='INV-000').delete()
+        self.otra_sede.delete()
+        res = self.client.get('/api/equipos/changes/', {'since': cursor})
+        self.assertEqual(len(res.data['deleted']), 4)
+
+    def test_rows_committed_after_the_cursor_are_sent(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        cursor = self.client.get('/api/equipos/changes/').data['cursor']
+        # Marcada antes de la lectura anterior por una transacción que se confirmó después
+        late = Equipos.objects.get(inventory_code='INV-003')
+        Equipos.objects.filter(pk=late.pk).update(updated_at=timezone.now() - timedelta(seconds=30))
+        res = self.client.get('/api/equipos/changes/', {'since': cursor})
+        self.assertIn(late.id, [e['id'] for e in res.data['updated']])
+
+    def test_invalid_cursor(self):
+        res = self.client.get('/api/equipos/changes/', {'since': 'ayer'})
+        self.assertEqual(res.status_code, 400)
+
+
+class EquiposSparseFieldsTests(EquiposAPITestCase):
+
+    def test_compact_list_uses_card_fields(self):
+        res = self.client.get('/api/equipos/', {'compact': 'true'})
+        self.assertEqual(len(res.data), 6)
+        self.assertNotIn('full', res.data[0])
+        self.assertNotIn('site_details', res.data[0])
+        self.assertEqual(res.data[0]['site'], self.sede.id)
+
+    def test_fields_and_omit_params(self):
+        res = self.client.get('/api/equipos/', {'fields': 'id,name,full', 'omit': 'full'})
+        self.assertEqual(set(res.data[0]), {'id', 'name'})
+
+    def test_detail_keeps_full_representation(self):
+        equipo = Equipos.objects.first()
+        res = self.client.get(f'/api/equipos/{equipo.id}/', {'compact': 'true'})
+        self.assertIn('full', res.data)
+
+
+class MaintenanceEventsTests(EquiposAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        from datetime import date, timedelta
+        from .models import calculate_next_date
+        self.calculate_next_date = calculate_next_date
+        today = date.today()
+        self._set('INV-000', maintenance_required=True, maintenance_frequency=1,
+                  last_maintenance_date=date(2024, 1, 31))
+        self._set('INV-001', maintenance_required=True, maintenance_frequency=6,
+                  acquisition_date=today - timedelta(days=170),
+                  calibration_required=True, calibration_frequency=12, last_calibration_date=today)
+        # Inactivo: no genera eventos
+        self._set('INV-005', maintenance_required=True, maintenance_frequency=1, last_maintenance_date=today)
+
+    def _set(self, inventory_code, **values):
+        equipo = Equipos.objects.get(inventory_code=inventory_code)
+        for field, value in values.items():
+            setattr(equipo, field, value)
+        equipo.save()
+        return equipo
+
+    def test_events_match_python_calculation_and_urgency_order(self):
+        from datetime import date
+        res = self.client.get('/api/equipos/maintenance-events/')
+        self.assertEqual([e['id'].split('-', 1)[1] for e in res.data], ['maintenance', 'maintenance', 'calibration'])
+        self.assertEqual(res.data[0]['nextDate'], '2024-02-29')
+        for event in res.data:
+            expected = self.calculate_next_date(date.fromisoformat(event['lastDate']), event['frequency'])
+            self.assertEqual(event['nextDate'], expected.isoformat())
+            self.assertEqual(event['daysRemaining'], (expected - date.today()).days)
+        self.assertEqual(res.data[0]['status'], 'overdue')
+
+    def test_filters_and_pagination(self):
+        res = self.client.get('/api/equipos/maintenance-events/', {'status': 'due,upcoming', 'type': 'maintenance'})
+        self.assertEqual(len(res.data), 1)
+        self.assertEqual(res.data[0]['inventoryCode'], 'INV-001')
+
+        res = self.client.get('/api/equipos/maintenance-events/', {'limit': 2})
+        self.assertEqual(res.data['count'], 3)
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_update_endpoint_and_backfill_keep_next_date(self):
+        from datetime import date
+        from io import StringIO
+        from django.core.management import call_command
+        equipo = Equipos.objects.get(inventory_code='INV-000')
+        self.client.post('/api/equipos/update-maintenance-date/', {
+            'equipment_id': equipo.id, 'date': '2025-05-31',
+        })
+        equipo.refresh_from_db()
+        self.assertEqual(equipo.next_maintenance_date, date(2025, 6, 30))
+
+        Equipos.objects.update(next_maintenance_date=None, next_calibration_date=None)
+        call_command('backfill_next_dates', stdout=StringIO())
+        equipo.refresh_from_db()
+        self.assertEqual(equipo.next_maintenance_date, date(2025, 6, 30))
+        self.assertIsNone(equipo.next_calibration_date)
+        self.assertIsNotNone(Equipos.objects.get(inventory_code='INV-001').next_calibration_date)
+
+    def test_save_with_update_fields_only_refreshes_dependent_fields(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        equipo = Equipos.objects.only('id', 'status').get(inventory_code='INV-000')
+        equipo.status = 'Inactivo'
+        # Sin lecturas de columnas diferidas; solo status y updated_at
+        with CaptureQueriesContext(connection) as queries:
+            equipo.save(update_fields=['status'])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('next_maintenance_date', queries[0]['sql'])
+        self.assertNotIn('name_key', queries[0]['sql'])
+
+        equipo = Equipos.objects.only('id', 'maintenance_frequency').get(inventory_code='INV-000')
+        equipo.maintenance_frequency = 2
+        equipo.save(update_fields=['maintenance_frequency'])
+        self.assertEqual(str(Equipos.objects.get(pk=equipo.pk).next_maintenance_date), '2024-03-31')
+
+
+class BulkUpdateDatesTests(EquiposAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        Equipos.objects.filter(status='Activo').update(
+            maintenance_required=True, maintenance_frequency=6,
+            calibration_required=True, calibration_frequency=12,
+        )
+        self.ids = dict(Equipos.objects.values_list('inventory_code', 'id'))
+
+    def test_applies_all_updates_in_one_write(self):
+        updates = [
+            {'equipment_id': self.ids['INV-000'], 'type': 'maintenance', 'date': '2025-01-31'},
+            {'equipment_id': self.ids['INV-000'], 'type': 'calibration', 'date': '2025-02-10'},
+            {'equipment_id': self.ids['INV-001'], 'type': 'maintenance', 'date': '2025-03-01'},
+        ]
+        # Rol del usuario, SAVEPOINT, SELECT de los equipos, UPDATE, INSERT del
+        # historial, RELEASE
+        with self.assertNumQueries(6):
+            res = self.client.post('/api/equipos/update-dates/', {'updates': updates}, format='json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['updated'], 3)
+        self.assertEqual(res.data['results'][0]['next_maintenance_date'], '2025-07-31')
+
+        equipo = Equipos.objects.get(inventory_code='INV-000')
+        self.assertEqual(str(equipo.last_calibration_date), '2025-02-10')
+        self.assertEqual(str(equipo.next_calibration_date), '2026-02-10')
+        self.assertEqual(str(equipo.next_maintenance_date), '2025-07-31')
+
+    def test_validates_as_a_set(self):
+        updates = [
+            {'equipment_id': self.ids['INV-000'], 'type': 'maintenance', 'date': '2025-01-31'},
+            {'equipment_id': self.ids['INV-005'], 'type': 'maintenance', 'date': '2025-01-31'},
+            {'equipment_id': self.ids['INV-000'], 'type': 'maintenance', 'date': '2025-02-01'},
+            {'equipment_id': 9999, 'type': 'calibration', 'date': '2025-01-31'},
+            {'equipment_id': self.ids['INV-001'], 'type': 'limpieza', 'date': '2025-01-31'},
+            {'equipment_id': self.ids['INV-001'], 'type': 'calibration', 'date': '31/01/2025'},
+        ]
+        res = self.client.post('/api/equipos/update-dates/', updates, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.data['failed'], 5)
+        self.assertEqual([r['success'] for r in res.data['results']], [False] * 6)
+        self.assertNotIn('error', res.data['results'][0])
+        self.assertIsNone(Equipos.objects.get(inventory_code='INV-000').last_maintenance_date)
+
+        res = self.client.post('/api/equipos/update-dates/', {'updates': updates, 'partial': True}, format='json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['updated'], 1)
+        self.assertEqual(str(Equipos.objects.get(inventory_code='INV-000').last_maintenance_date), '2025-01-31')
+
+
+class EquiposBulkTests(EquiposAPITestCase):
+    url = '/api/equipos/bulk/'
+
+    def test_bulk_create_validates_relations_once(self):
+        items = [
+            {'inventory_code': f'NEW-{i}', 'name': f'Monitor {i}', 'site': self.sede.id,
+             'service': self.servicio.id, 'responsible': self.responsable.id}
+            for i in range(10)
+        ]
+        # Rol, SAVEPOINT, una consulta por relación, unicidad, INSERT, RELEASE
+        with self.assertNumQueries(8):
+            res = self.client.post(self.url, items, format='json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['applied'], 10)
+        created = Equipos.objects.get(pk=res.data['results'][3]['id'])
+        self.assertEqual((created.inventory_code, created.ecri_code), ('NEW-3', 'ECRI-NEW-3'))
+
+    def test_bulk_create_all_or_nothing_and_partial(self):
+        items = [
+            {'inventory_code': 'NEW-1', 'site': self.sede.id},
+            {'inventory_code': 'INV-000'},
+            {'inventory_code': 'NEW-1'},
+            {'inventory_code': 'NEW-2', 'site': 9999},
+        ]
+        res = self.client.post(self.url, items, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.data['failed'], 3)
+        self.assertEqual(set(res.data['results'][1]['errors']), {'inventory_code'})
+        self.assertEqual(set(res.data['results'][3]['errors']), {'site'})
+        self.assertFalse(Equipos.objects.filter(inventory_code='NEW-1').exists())
+
+        res = self.client.post(self.url, {'items': items, 'partial': True}, format='json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['applied'], 1)
+        self.assertTrue(Equipos.objects.filter(inventory_code='NEW-1', responsible=self.responsable).exists())
+
+    def test_bulk_transfer_and_decommission(self):
+        ids = list(Equipos.objects.filter(site=self.sede).values_list('id', flat=True))
+        items = [{'id': pk, 'site': self.otra_sede.id} for pk in ids]
+        items.append({'id': ids[0], 'status': 'Inactivo'})
+        res = self.client.patch(self.url, items, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('id', res.data['results'][-1]['errors'])
+
+        items[-1] = {'id': ids[1], 'inventory_code': 'INV-005'}
+        res = self.client.patch(self.url, {'items': items, 'partial': True}, format='json')
+        self.assertEqual(res.data['applied'], 3)
+        self.assertFalse(Equipos.objects.filter(site=self.sede).exists())
+        # Un PATCH parcial no toca el responsable ni el código ECRI
+        self.assertEqual(Equipos.objects.get(pk=ids[0]).ecri_code, 'ECRI-0')
+
+    def test_bulk_update_uses_constant_queries(self):
+        for i in range(14):
+            Equipos.objects.create(
+                inventory_code=f'EXTRA-{i}', name='Monitor', site=self.sede, responsible=self.responsable,
+            )
+        items = [{'id': pk, 'site': self.otra_sede.id} for pk in Equipos.objects.values_list('id', flat=True)]
+        self.assertEqual(len(items), 20)
+        # Rol, SELECT de los equipos, SAVEPOINT, SELECT de la sede, UPDATE, RELEASE
+        with self.assertNumQueries(6):
+            res = self.client.patch(self.url, items, format='json')
+        self.assertEqual(res.data['applied'], 20)
+        self.assertFalse(Equipos.objects.filter(site=self.sede).exists())
+
+    def test_batch_endpoints_validate_the_payload(self):
+        for url in (self.url, '/api/equipos/transfer/', '/api/equipos/update-dates/'):
+            res = self.client.post(url, [], format='json')
+            self.assertEqual(res.status_code, 400)
+            self.assertIn('requerido', res.data['error'])
+            res = self.client.post(url, [{}] * (BULK_MAX_ITEMS + 1), format='json')
+            self.assertEqual(res.status_code, 400)
+            self.assertIn(str(BULK_MAX_ITEMS), res.data['error'])
+
+    def test_bulk_delete(self):
+        ids = list(Equipos.objects.filter(status='Inactivo').values_list('id', flat=True))
+        res = self.client.delete(self.url, ids + [9999], format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(Equipos.objects.count(), 6)
+        res = self.client.delete(self.url, {'items': ids + [9999], 'partial': True}, format='json')
+        self.assertEqual(res.data['applied'], 2)
+        self.assertEqual(Equipos.objects.count(), 4)
+
+
+class EquipoHistoryTests(EquiposAPITestCase):
+
+    def test_bulk_transfer_records_history(self):
+        equipos = list(Equipos.objects.filter(site=self.sede).order_by('id'))
+        servicio_sur = Servicio.objects.create(nombre='Urgencias', sede=self.otra_sede)
+        items = [
+            {'equipment_id': e.id, 'site': self.otra_sede.id, 'service': servicio_sur.id,
+             'justification': 'Reorganización'}
+            for e in equipos
+        ]
+        # Rol, SAVEPOINT, equipos, sedes, servicios, UPDATE, INSERT, RELEASE
+        with self.assertNumQueries(8):
+            res = self.client.post('/api/equipos/transfer/', {'items': items}, format='json')
+        self.assertEqual(res.data['transferred'], 3)
+        self.assertFalse(Equipos.objects.filter(site=self.sede).exists())
+
+        res = self.client.get(f'/api/equipos/{equipos[0].id}/history/transfers/')
+        record = res.data['results'][0]
+        self.assertEqual((record['from_site'], record['to_site']), (self.sede.id, self.otra_sede.id))
+        self.assertEqual(record['to_responsible'], self.responsable.id)
+        self.assertEqual(record['user'], self.admin.id)
+
+    def test_transfer_validates_service_belongs_to_site(self):
+        equipo = Equipos.objects.get(inventory_code='INV-000')
+        res = self.client.post('/api/equipos/transfer/', {
+            'equipment_id': equipo.id, 'site': self.otra_sede.id, 'service': self.servicio.id,
+            'justification': 'x',
+        }, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('servicio', res.data['results'][0]['error'])
+
+    def test_decommission_and_maintenance_history(self):
+        equipo = Equipos.objects.get(inventory_code='INV-000')
+        for day in ('2025-01-10', '2025-02-10', '2025-03-10'):
+            self.client.post('/api/equipos/update-maintenance-date/', {'equipment_id': equipo.id, 'date': day})
+        res = self.client.get(f'/api/equipos/{equipo.id}/history/maintenance/', {'page_size': 2})
+        self.assertEqual([r['date'] for r in res.data['results']], ['2025-03-10', '2025-02-10'])
+        res = self.client.get(res.data['next'])
+        self.assertEqual([r['date'] for r in res.data['results']], ['2025-01-10'])
+
+        res = self.client.post(f'/api/equipos/{equipo.id}/decommission/', {'reason': 'Obsoleto', 'date': '2025-04-01'})
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(Equipos.objects.get(pk=equipo.id).status, 'Inactivo')
+        res = self.client.post(f'/api/equipos/{equipo.id}/decommission/', {'reason': 'Otra vez'})
+        self.assertEqual(res.status_code, 400)
+
+        # El historial sobrevive al borrado del equipo
+        equipo.delete()
+        record = EquipoDecommission.objects.get()
+        self.assertEqual((record.equipo_id, record.inventory_code), (None, 'INV-000'))
+        with self.assertRaises(ValueError):
+            record.save()
+
+
+class FullTextSearchTests(EquiposAPITestCase):
+    url = '/api/equipos/search/'
+
+    def test_ranked_search_over_indexed_columns(self):
+        Equipos.objects.filter(inventory_code='INV-003').update(
+            provider='Biomédica Andina', physical_location='Laboratorio clínico',
+        )
+        res = self.client.get(self.url, {'q': 'biomedica'})
+        self.assertEqual([e['inventory_code'] for e in res.data['results']], ['INV-003'])
+        res = self.client.get(self.url, {'q': 'centrif thermo'})
+        self.assertCountEqual([e['inventory_code'] for e in res.data['results']], ['INV-001', 'INV-003', 'INV-005'])
+        res = self.client.get(self.url, {'q': 'INV-00', 'status': 'Activo', 'limit': 2})
+        self.assertEqual(res.data['count'], 4)
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_index_follows_saves_bulk_writes_and_deletes(self):
+        equipo = Equipos.objects.get(inventory_code='INV-000')
+        equipo.name = 'Ventilador mecánico'
+        equipo.save()
+        self.assertEqual(self.client.get(self.url, {'q': 'ventilador'}).data['count'], 1)
+        Equipos.objects.filter(pk=equipo.pk).update(serial='SN-777')
+        self.assertEqual(self.client.get(self.url, {'q': 'sn-777'}).data['count'], 1)
+        equipo.delete()
+        self.assertEqual(self.client.get(self.url, {'q': 'ventilador'}).data['count'], 0)
+
+    def test_admin_search_uses_index(self):
+        from django.contrib.admin.sites import site
+        from django.test import RequestFactory
+        request = RequestFactory().get('/')
+        queryset, _ = site._registry[Equipos].get_search_results(request, Equipos.objects.all(), 'inv-004')
+        self.assertEqual([e.inventory_code for e in queryset], ['INV-004'])
+
+    def test_query_required(self):
+        self.assertEqual(self.client.get(self.url, {'q': ' '}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'q': '"*'}).data['count'], 0)
+
+
+class FuzzySearchTests(EquiposAPITestCase):
+    url = '/api/equipos/search/'
+
+    def test_keys_are_normalized_on_every_write(self):
+        equipo = Equipos.objects.get(inventory_code='INV-000')
+        equipo.name = '  Calibración   PIPETAS '
+        equipo.save(update_fields=['name'])
+        equipo.refresh_from_db()
+        self.assertEqual(equipo.name_key, 'calibracion pipetas')
+        self.assertEqual(equipo.brand_key, 'eppendorf')
+
+    def test_brand_filter_ignores_accents_and_case(self):
+        Equipos.objects.filter(inventory_code='INV-002').update(brand='Équipo Médico', brand_key='equipo medico')
+        res = self.client.get('/api/equipos/', {'brand': 'EQUIPO med'})
+        self.assertEqual([e['inventory_code'] for e in res.data], ['INV-002'])
+        res = self.client.get('/api/equipos/', {'brand': 'therm'})
+        self.assertEqual([e['inventory_code'] for e in res.data], ['INV-001', 'INV-003', 'INV-005'])
+        # Subcadena, como applyFilters del frontend
+        Equipos.objects.filter(inventory_code='INV-001').update(brand='Thermo Fisher', brand_key='thermo fisher')
+        res = self.client.get('/api/equipos/', {'brand': 'FISHER'})
+        self.assertEqual([e['inventory_code'] for e in res.data], ['INV-001'])
+        res = self.client.get('/api/equipos/', {'brand': 'médico'})
+        self.assertEqual([e['inventory_code'] for e in res.data], ['INV-002'])
+
+    def test_typos_fall_back_to_trigram_matching(self):
+        equipo = Equipos.objects.get(inventory_code='INV-004')
+        equipo.name = 'Calibración de balanzas'
+        equipo.save()
+        # Sin coincidencias exactas se usa la búsqueda aproximada
+        res = self.client.get(self.url, {'q': 'calibarcion'})
+        self.assertEqual([e['inventory_code'] for e in res.data['results']], ['INV-004'])
+        res = self.client.get(self.url, {'q': 'eppendorff', 'fuzzy': '1'})
+        self.assertEqual([e['inventory_code'] for e in res.data['results']], ['INV-000', 'INV-002', 'INV-004'])
+        self.assertEqual(self.client.get(self.url, {'q': 'zzzz'}).data['count'], 0)
+
+
+class QueryPlanTests(EquiposAPITestCase):
+
+    def test_hot_queries_use_the_composite_indexes(self):
+        from io import StringIO
+        from django.core.management import call_command
+        out = StringIO()
+        call_command('explain_equipos_queries', '--compare', '--repeat', '1', stdout=out)
+        with_indexes, without_indexes = out.getvalue().split('Sin índices')
+        for name in ('equipos_status_site_svc_idx', 'equipos_status_next_maint_idx', 'equipos_status_next_calib_idx'):
+            self.assertIn(name, with_indexes)
+            self.assertNotIn(name, without_indexes)
+        # La comparación se revierte
+        self.assertEqual(self.client.get('/api/equipos/', {'status': 'Activo'}).status_code, 200)
+        self.assertEqual(len(Equipos._meta.indexes), 3)
+
+
+class DatabaseSettingsTests(TestCase):
+
+    def test_sqlite_pragmas_are_applied_on_connect(self):
+        from django.db import connection
+        if connection.vendor != 'sqlite':
+            self.skipTest('Solo aplica a SQLite')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'], REPLICA_PIN_SECONDS=5)
+class ReplicaRoutingTests(TestCase):
+
+    def setUp(self):
+        caches['replica_pins'].clear()
+
+    def _route(self, method, status=200, user_id=None, **cookies):
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from rest_framework_simplejwt.tokens import AccessToken
+        from backend_lime.replicas import ReplicaRouter, ReplicaRoutingMiddleware
+        seen = {}
+
+        def view(request):
+            router = ReplicaRouter()
+            seen['read'] = router.db_for_read(Equipos)
+            seen['write'] = router.db_for_write(Equipos)
+            return HttpResponse(status=status)
+
+        factory = RequestFactory()
+        for name, value in cookies.items():
+            factory.cookies[name] = value
+        headers = {}
+        if user_id is not None:
+            token = AccessToken()
+            token['user_id'] = user_id
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        response = ReplicaRoutingMiddleware(view)(factory.generic(method, '/api/equipos/', **headers))
+        return seen, response
+
+    def test_reads_go_to_replicas_and_writes_to_primary(self):
+        from backend_lime.replicas import ReplicaRouter
+        seen, response = self._route('GET')
+        self.assertIn(seen['read'], ['replica1', 'replica2'])
+        self.assertEqual(seen['write'], 'default')
+        self.assertNotIn('replica_pin', response.cookies)
+        # Fuera de una petición (comandos, pruebas) se usa el primario
+        self.assertEqual(ReplicaRouter().db_for_read(Equipos), 'default')
+        self.assertFalse(ReplicaRouter().allow_migrate('replica1', 'equipos'))
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        # Por usuario del JWT, en la caché compartida: el frontend no devuelve cookies
+        seen, response = self._route('PATCH', user_id=7)
+        self.assertEqual(seen['read'], 'default')
+        self.assertNotIn('replica_pin', response.cookies)
+        self.assertEqual(self._route('GET', user_id=7)[0]['read'], 'default')
+        self.assertIn(self._route('GET', user_id=8)[0]['read'], ['replica1', 'replica2'])
+        # Sin JWT (admin, API navegable), con la cookie
+        _, response = self._route('PATCH')
+        self.assertEqual(response.cookies['replica_pin']['max-age'], 5)
+        self.assertEqual(self._route('GET', replica_pin='1')[0]['read'], 'default')
+
+    def test_pin_lookup_does_not_query_the_database(self):
+        self._route('PATCH', user_id=7)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._route('GET', user_id=7)[0]['read'], 'default')
+            self.assertIn(self._route('GET')[0]['read'], ['replica1', 'replica2'])
+
+    def test_failed_writes_do_not_pin(self):
+        self._route('POST', status=400, user_id=7)
+        self.assertIn(self._route('GET', user_id=7)[0]['read'], ['replica1', 'replica2'])
+        _, response = self._route('POST', status=500)
+        self.assertNotIn('replica_pin', response.cookies)
+
+
+class AsyncReadEndpointsTests(EquiposAPITestCase):
+
+    def test_async_lists_match_the_sync_endpoints(self):
+        for path, params in (
+            ('equipos/', {}),
+            ('equipos/', {'status': 'Activo', 'compact': '1', 'ordering': '-inventory_code'}),
+            ('equipos/', {'page_size': 2}),
+            ('equipos/maintenance-events/', {}),
+            ('sedes/', {}),
+            ('servicios/', {}),
+            ('responsables/', {}),
+        ):
+            sync = self.client.get(f'/api/{path}', params)
+            res = self.client.get(f'/api/async/{path}', params)
+            self.assertEqual(res.status_code, 200, path)
+            if 'page_size' in params:
+                # Los enlaces de la página apuntan a la ruta async
+                self.assertIn('/api/async/equipos/?cursor=', res.data['next'])
+                self.assertEqual(res.json()['results'], sync.json()['results'])
+            else:
+                self.assertEqual(res.json(), sync.json(), path)
+
+    def test_retrieve_etag_and_errors(self):
+        equipo = Equipos.objects.get(inventory_code='INV-002')
+        res = self.client.get(f'/api/async/equipos/{equipo.pk}/')
+        self.assertEqual(res.data['inventory_code'], 'INV-002')
+        self.assertEqual(self.client.get(f'/api/async/equipos/{equipo.pk}/', HTTP_IF_NONE_MATCH=res['ETag']).status_code, 304)
+        self.assertEqual(self.client.get('/api/async/equipos/999999/').status_code, 404)
+        self.assertEqual(self.client.get('/api/async/equipos/maintenance-events/', {'from': 'x'}).status_code, 400)
+        self.assertEqual(self.client.post('/api/async/equipos/').status_code, 405)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/async/equipos/').status_code, 401)
+
+    def test_reference_lists_use_the_cache(self):
+        from django.core.cache import caches
+        caches['reference'].clear()
+        self.assertEqual(self.client.get('/api/async/sedes/')['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/async/sedes/')['X-Cache'], 'HIT')
+
+
+class JSONRendererTests(EquiposAPITestCase):
+
+    def test_output_matches_drf_renderer(self):
+        from datetime import datetime, timezone as dt_timezone
+        from decimal import Decimal
+        from rest_framework.renderers import JSONRenderer
+        from backend_lime.renderers import FastJSONRenderer
+        data = {
+            'equipos': self.client.get('/api/equipos/').data,
+            'as_dict': [e.as_dict() for e in Equipos.objects.select_related('site', 'service', 'responsible')],
+            'values': [Decimal('1500000.50'), date(2024, 3, 15), datetime(2024, 3, 15, 8, 30, 0, 123456, dt_timezone.utc)],
+            1: 'línea\u2028separada',
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        # Con indentación se usa el renderer de DRF
+        self.assertIn(b'\n    ', FastJSONRenderer().render(data, 'application/json; indent=4'))
+
+    def test_stdlib_fallback_and_parse_errors(self):
+        from unittest import mock
+        from backend_lime import renderers
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(renderers.FastJSONRenderer().render({'d': date(2024, 1, 2)}), b'{"d":"2024-01-02"}')
+        res = self.client.patch(
+            f'/api/equipos/{Equipos.objects.first().pk}/', data='{"name": ', content_type='application/json',
+        )
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('JSON parse error', res.data['detail'])
+
+
+class BootstrapTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='lector', password='x')
+        sede = Sede.objects.create(nombre_sede='Sede Norte')
+        Servicio.objects.create(nombre='Laboratorio', sede=sede)
+        responsable = Responsable.objects.create(name='Ana', role='')
+        for i in range(3):
+            Equipos.objects.create(inventory_code=f'INV-{i}', name=f'Equipo {i}', ecri_code='', responsible=responsable)
+
+    def setUp(self):
+        caches['reference'].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_one_response_with_reference_tables_and_first_page(self):
+        res = self.client.get('/api/bootstrap/', {'page_size': 2})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([s['name'] for s in res.data['sites']], ['Sede Norte'])
+        self.assertEqual(res.data['services'][0]['name'], 'Laboratorio')
+        self.assertEqual(res.data['responsibles'][0]['name'], 'Ana')
+        self.assertEqual([e['inventory_code'] for e in res.data['equipos']['results']], ['INV-0', 'INV-1'])
+        next_link = res.data['equipos']['next']
+        self.assertTrue(next_link.startswith('/api/equipos/?'))
+        for param in ('compact=1', 'page_size=2', 'cursor='):
+            self.assertIn(param, next_link)
+        next_page = self.client.get(next_link).data['results']
+        self.assertEqual([e['inventory_code'] for e in next_page], ['INV-2'])
+
+    def test_cached_and_revalidated(self):
+        etag = self.client.get('/api/bootstrap/')['ETag']
+        # Una consulta por petición (el validador de equipos): las tablas de
+        # referencia usan su versión en caché y el cuerpo también está en caché
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get('/api/bootstrap/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertEqual(self.client.get('/api/bootstrap/')['ETag'], etag)
+
+        Sede.objects.create(nombre_sede='Sede Sur')
+        res = self.client.get('/api/bootstrap/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.data['sites']), 2)
+
+
+class EquiposImporterTests(EquiposAPITestCase):
+
+    def _row(self, i, **extra):
+        from .parsing import F147_COLUMNS, RESPONSABLE_HEADER, SEDE_HEADER, SERVICIO_HEADER
+        row = {header: '' for _, header, _ in F147_COLUMNS}
+        row.update({
+            'Código de inventario interno del laboratorio y/o asignado por UdeA': f'IMP-{i:04d}',
+            'Nombre del equipo': f'Balanza {i}',
+            'Código IPS': f'IPS-{i}',
+            'Antigüedad del eq. (F. adquisición)': '15/03/2020',
+            'Mantenimiento Si/No': 'Sí',
+            'Frecuencia anual mantenimiento': '12',
+            SEDE_HEADER: ' Sede Norte ',
+            SERVICIO_HEADER: 'Laboratorio',
+            RESPONSABLE_HEADER: f'Técnico {i % 3}',
+        })
+        row.update(extra)
+        return row
+
+    def test_bulk_import_uses_constant_queries_per_batch(self):
+        from datetime import date
+        from .importer import EquiposImporter
+        rows = [self._row(i) for i in range(30)]
+
+        # sedes, servicios, responsables; luego por cada bloque de 15: savepoint,
+        # alta de responsables (+ relectura solo en el primero), búsqueda de
+        # existentes, INSERT y release.
+        with self.assertNumQueries(3 + 6 + 4):
+            importer = EquiposImporter(batch_size=15).run(rows)
+
+        self.assertEqual((importer.rows, importer.created, importer.updated), (30, 30, 0))
+        equipo = Equipos.objects.get(inventory_code='IMP-0005')
+        self.assertEqual(equipo.site, self.sede)
+        self.assertEqual(equipo.responsible.name, 'Técnico 2')
+        self.assertEqual(equipo.next_maintenance_date, date(2021, 3, 15))
+        self.assertEqual(Responsable.objects.filter(name__startswith='Técnico').count(), 3)
+
+    def test_reimport_updates_only_changed_rows(self):
+        from .importer import EquiposImporter
+        EquiposImporter().run([self._row(i) for i in range(5)])
+        existing = Equipos.objects.get(inventory_code='INV-000')
+        existing.ips_code = 'IPS-LEGACY'
+        existing.save()
+
+        rows = [self._row(i) for i in range(5)]
+        rows[2]['Marca'] = 'Mettler'
+        # Coincide por código IPS con un equipo cargado desde la interfaz
+        rows.append(self._row(7, **{
+            'Código de inventario interno del laboratorio y/o asignado por UdeA': '',
+            'Código IPS': 'IPS-LEGACY', 'Modelo': 'X1',
+        }))
+        importer = EquiposImporter(batch_size=4).run(rows, start_row=2)
+
+        self.assertEqual(
+            (importer.rows, importer.created, importer.updated, importer.unchanged, importer.last_row),
+            (5, 0, 2, 3, 6),
+        )
+        self.assertEqual(Equipos.objects.get(inventory_code='IMP-0002').brand, 'Mettler')
+        existing.refresh_from_db()
+        self.assertEqual((existing.model, existing.inventory_code), ('X1', 'INV-000'))
+
+    def test_blank_cells_keep_existing_values(self):
+        from .importer import EquiposImporter
+        full = self._row(0, **{
+            'Código ECRI': 'ECRI-9', 'Serie': 'SN-1', 'Proveedor equipo': 'Acme',
+            'Ubicación física': 'Piso 2', 'Hoja de vida': 'Sí', 'Fecha de fabricación': '01/02/2019',
+        })
+        EquiposImporter().run([full])
+        partial = self._row(0, **{'Antigüedad del eq. (F. adquisición)': '', 'Mantenimiento Si/No': '',
+                                  'Frecuencia anual mantenimiento': '', 'Nombre del equipo': ''})
+
+        importer = EquiposImporter().run([partial])
+
+        self.assertEqual((importer.updated, importer.unchanged), (0, 1))
+        equipo = Equipos.objects.get(inventory_code='IMP-0000')
+        self.assertEqual(
+            (equipo.name, equipo.ecri_code, equipo.serial, equipo.provider, equipo.physical_location),
+            ('Balanza 0', 'ECRI-9', 'SN-1', 'Acme', 'Piso 2'),
+        )
+        self.assertTrue(equipo.has_life_sheet and equipo.maintenance_required)
+        self.assertEqual(str(equipo.fabrication_date), '2019-02-01')
+
+    def test_rows_whose_codes_match_different_equipos_are_rejected(self):
+        from .importer import EquiposImporter
+        Equipos.objects.filter(inventory_code='INV-001').update(ips_code='IPS-B')
+        code, ips = 'Código de inventario interno del laboratorio y/o asignado por UdeA', 'Código IPS'
+        rows = [
+            self._row(0, **{code: 'INV-000', ips: 'IPS-B'}),
+            self._row(1),
+            self._row(2),
+            # Choca con las dos filas anteriores del mismo bloque
+            self._row(3, **{code: 'IMP-0001', ips: 'IPS-2'}),
+        ]
+
+        importer = EquiposImporter().run(rows)
+
+        self.assertEqual((importer.created, importer.updated), (2, 0))
+        self.assertEqual([(row, code) for row, code, _ in importer.errors], [(1, 'INV-000'), (4, 'IMP-0001')])
+        self.assertIsNone(Equipos.objects.get(inventory_code='INV-000').ips_code)
+        self.assertEqual(Equipos.objects.get(inventory_code='IMP-0001').ips_code, 'IPS-1')
+
+    def test_responsables_match_without_accents_or_case(self):
+        from .importer import EquiposImporter
+        from .parsing import RESPONSABLE_HEADER
+        jose = Responsable.objects.create(name='José Pérez', role='')
+        rows = [self._row(0, **{RESPONSABLE_HEADER: 'JOSE PEREZ'}),
+                self._row(1, **{RESPONSABLE_HEADER: 'María  Gómez'}),
+                self._row(2, **{RESPONSABLE_HEADER: 'maria gomez'})]
+        EquiposImporter().run(rows)
+        self.assertEqual(Equipos.objects.get(inventory_code='IMP-0000').responsible, jose)
+        self.assertEqual(Responsable.objects.filter(name_key='maria gomez').count(), 1)
+
+    def test_dry_run_rolls_back(self):
+        from .importer import EquiposImporter
+        importer = EquiposImporter(dry_run=True).run([self._row(i) for i in range(3)])
+        self.assertEqual(importer.created, 3)
+        self.assertFalse(Equipos.objects.filter(inventory_code__startswith='IMP-').exists())
+
+    def test_command_rejects_start_row_below_one(self):
+        from django.core.management import CommandError, call_command
+        for start_row in (0, -3):
+            with self.assertRaisesMessage(CommandError, '--start-row'):
+                call_command('import_equipos_csv', 'equipos.csv', start_row=start_row)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        from .importer import EquiposImporter
+        rows = [self._row(i) for i in range(4)]
+        rows[1]['Fecha de fabricación'] = '31/31/2020'
+        rows[2]['Frecuencia anual mantenimiento'] = 'doce'
+        rows[3]['Responsable del proceso en el que interviene el equipo y/o inventario UdeA'] = ''
+
+        importer = EquiposImporter(workers=2, batch_size=2).run(rows)
+
+        self.assertEqual(importer.created, 1)
+        self.assertEqual([(row, code) for row, code, _ in importer.errors],
+                         [(2, 'IMP-0001'), (3, 'IMP-0002'), (4, 'IMP-0003')])
+        self.assertIn('Fecha de fabricación', importer.errors[0][2])
+
+
+class DateParserTests(TestCase):
+
+    def test_detects_and_remembers_column_format(self):
+        from datetime import date
+        from .parsing import DateParser
+        parser = DateParser()
+        self.assertEqual(parser('2020-03-15'), date(2020, 3, 15))
+        self.assertEqual(parser.format, '%Y-%m-%d')
+        self.assertEqual(parser('15/03/20'), date(2020, 3, 15))
+        self.assertEqual(parser('15/03/2020 (10:30)'), date(2020, 3, 15))
+        with self.assertRaises(ValueError):
+            parser('marzo 2020')
+
+
+class EquiposExportTests(EquiposAPITestCase):
+
+    def test_csv_export_streams_filtered_rows_that_reimport(self):
+        import csv
+        import io
+        from .importer import EquiposImporter
+        res = self.client.get('/api/equipos/export/', {'status': 'Activo', 'ordering': 'inventory_code'})
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.streaming)
+        content = b''.join(res.streaming_content).decode('utf-8-sig')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([r['Código de inventario interno del laboratorio y/o asignado por UdeA'] for r in rows],
+                         ['INV-000', 'INV-001', 'INV-002', 'INV-003'])
+        self.assertEqual(rows[0]['Sede'], 'Sede Norte')
+        self.assertEqual(rows[0]['Hoja de vida'], 'No')
+
+        importer = EquiposImporter().run(rows)
+        self.assertEqual((importer.created, importer.updated, importer.unchanged), (0, 0, 4))
+
+    def test_export_errors_are_json(self):
+        res = self.client.get('/api/equipos/export/', HTTP_ACCEPT='application/pdf')
+        self.assertEqual(res.status_code, 406)
+        self.assertEqual(res['Content-Type'], 'application/json')
+        self.assertIn('detail', res.json())
+        self.client.force_authenticate(None)
+        res = self.client.get('/api/equipos/export/', {'format': 'xlsx'})
+        self.assertEqual(res.status_code, 401)
+        self.assertEqual(res['Content-Type'], 'application/json')
+        self.assertNotIn('Content-Disposition', res)
+
+    def test_xlsx_export(self):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            self.skipTest('openpyxl no está instalado')
+        import io
+        res = self.client.get('/api/equipos/export/', {'format': 'xlsx'})
+        self.assertEqual(res.status_code, 200)
+        sheet = load_workbook(io.BytesIO(b''.join(res.streaming_content))).active
+        self.assertEqual(sheet.max_row, 7)
@@ -2,7 +2,8 @@ from django.urls import path
 from .views import (
     maintenance_events,
     update_maintenance_date,
-    update_calibration_date
+    update_calibration_date,
+    bulk_update_dates
 )
 
 # Nota: EquiposViewSet ya está registrado en backend_lime/urls.py
@@ -11,4 +12,5 @@ urlpatterns = [
     path('maintenance-events/', maintenance_events, name='maintenance-events'),
     path('update-maintenance-date/', update_maintenance_date, name='update-maintenance-date'),
     path('update-calibration-date/', update_calibration_date, name='update-calibration-date'),
+    path('update-dates/', bulk_update_dates, name='update-dates'),
 ]
\ No newline at end of file
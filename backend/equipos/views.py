@@ -1,56 +1,390 @@
-from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework import viewsets, status, filters
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from datetime import date
-from calendar import monthrange
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+from django.db import transaction
+from django.db.models import CharField, DateField, F, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from datetime import date, timedelta
 from users.permissions import IsAdminOrReadOnly, IsAdmin
-from .models import Equipos
-from .serializers import EquiposSerializer
+from backend_lime.reference_cache import get_version as get_reference_version
+from backend_lime.renderers import FastJSONRenderer
+from backend_lime.conditional import ConditionalGetMixin, make_etag, not_modified, table_state
+from responsables.models import Responsable
+from sedes.models import Sede
+from servicios.models import Servicio
+from .models import Equipos, EquipoDecommission, EquipoMaintenanceRecord, EquipoTombstone, EquipoTransfer
+from .serializers import (
+    EquiposSerializer, EquiposListSerializer,
+    EquipoDecommissionSerializer, EquipoMaintenanceRecordSerializer, EquipoTransferSerializer,
+)
+from .bulk import batch_response, is_failed, item_id, load_equipos, parse_payload, update_equipos
+from .filters import EquiposFilterBackend
+from .pagination import EquiposCursorPagination, HistoryPagination, MaintenanceEventsPagination, SearchPagination
+from .expressions import DaysBetween
+from .exporter import stream_csv, write_xlsx
+from .renderers import CSVPassthroughRenderer, XLSXPassthroughRenderer
+from .search import KEY_COLUMNS, fuzzy_search, search
 
-class EquiposViewSet(viewsets.ModelViewSet):
-    queryset = Equipos.objects.all()
+HISTORY_MODELS = {
+    'transfers': (EquipoTransfer, EquipoTransferSerializer),
+    'decommissions': (EquipoDecommission, EquipoDecommissionSerializer),
+    'maintenance': (EquipoMaintenanceRecord, EquipoMaintenanceRecordSerializer),
+}
+
+
+def history_user_id(request):
+    """Id del usuario que registra un evento (también con autenticación sin estado)."""
+    return getattr(request.user, 'pk', None)
+
+
+def equipos_state(references=True):
+    """
+    Validador del inventario para los ETag: una agregación sobre equipos. Con
+    ``references`` (respuestas que incluyen el nombre de la sede, el servicio
+    y el responsable) también cuentan las versiones de esas tablas en la
+    caché de referencia, que no consultan la base de datos.
+    """
+    state = table_state(Equipos.objects.all(), 'updated_at')
+    if not references:
+        return state
+    return state, [get_reference_version(model) for model in (Sede, Servicio, Responsable)]
+
+
+class EquiposViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    # Las relaciones se resuelven en el mismo JOIN: el serializer anida sede,
+    # servicio y responsable y as_dict() usa su __str__.
+    queryset = Equipos.objects.select_related('site', 'service', 'responsible')
     serializer_class = EquiposSerializer
     permission_classes = [IsAuthenticated, IsAdminOrReadOnly]
+    pagination_class = EquiposCursorPagination
+    filter_backends = [EquiposFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    search_fields = ['name', 'brand', 'model', 'inventory_code']
+    # Solo columnas indexadas, para que el orden no obligue a recorrer la
+    # tabla completa. Con cursor el id desempata y las columnas anulables se
+    # ordenan sin NULL (ver EquiposCursorPagination).
+    ordering_fields = ['id', 'inventory_code', 'ips_code', 'site', 'service', 'responsible']
+    ordering = ['id']
+    etag_updated_field = 'updated_at'
+
+    def get_etag(self, request):
+        # La vista compacta solo trae los ids de las relaciones
+        return make_etag(request, equipos_state(references=not self._is_compact()))
+
+    def _is_compact(self):
+        return self.action in ('list', 'changes') and self.request.query_params.get('compact', '').lower() in ('1', 'true')
 
     def get_queryset(self):
-        queryset = Equipos.objects.all()
-        inventory_code = self.request.query_params.get('inventory_code', None)
-        if inventory_code is not None:
-            queryset = queryset.filter(inventory_code=inventory_code)
-        return queryset
+        if self._is_compact():
+            # La vista compacta solo lee sus columnas y los ids de las relaciones.
+            columns = [f for f in EquiposListSerializer.Meta.fields if f != 'display']
+            return Equipos.objects.only(*columns)
+        return super().get_queryset()
 
+    def get_serializer_class(self):
+        if self._is_compact():
+            return EquiposListSerializer
+        return EquiposSerializer
 
-def calculate_next_date(last_date, frequency_months):
-    """Calcula la próxima fecha de mantenimiento/calibración basándose en la última fecha y frecuencia"""
-    if not last_date or not frequency_months or frequency_months <= 0:
-        return None
-    
-    # Calcular la próxima fecha sumando los meses
-    year = last_date.year
-    month = last_date.month + frequency_months
-    
-    # Ajustar año si los meses exceden 12
-    while month > 12:
-        month -= 12
-        year += 1
-    
-    try:
-        return date(year, month, last_date.day)
-    except ValueError:
-        # Si el día no existe en el mes (ej: 31 de febrero), usar el último día del mes
-        last_day = monthrange(year, month)[1]
-        return date(year, month, min(last_date.day, last_day))
+    def finalize_response(self, request, response, *args, **kwargs):
+        # Los errores de export (401, 406, filtros inválidos) se responden en
+        # JSON: los renderers del archivo no saben representarlos. export solo
+        # devuelve un Response de DRF cuando hay un error.
+        if self.action == 'export' and isinstance(response, Response):
+            request.accepted_renderer = FastJSONRenderer()
+            request.accepted_media_type = FastJSONRenderer.media_type
+        return super().finalize_response(request, response, *args, **kwargs)
 
+    @action(detail=False, methods=['get'], renderer_classes=[CSVPassthroughRenderer, XLSXPassthroughRenderer])
+    def export(self, request):
+        """
+        Exporta el inventario con las columnas de la hoja F-147, aplicando los
+        mismos filtros que el listado. CSV por defecto; ``?format=xlsx`` (o el
+        encabezado Accept) para Excel.
+        """
+        queryset = self.filter_queryset(Equipos.objects.all())
+        filename = f'inventario-equipos-{date.today().isoformat()}'
 
-def calculate_days_remaining(next_date):
-    """Calcula los días restantes hasta una fecha"""
-    if not next_date:
-        return None
-    
-    today = date.today()
-    delta = (next_date - today).days
-    return delta
+        if request.accepted_renderer.format == 'xlsx':
+            return FileResponse(
+                write_xlsx(queryset),
+                as_attachment=True,
+                filename=f'{filename}.xlsx',
+                content_type=XLSXPassthroughRenderer.media_type,
+            )
+
+        response = StreamingHttpResponse(stream_csv(queryset), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+        return response
+
+    @action(detail=False, methods=['post', 'patch', 'delete'])
+    def bulk(self, request):
+        """
+        Operaciones masivas: POST crea, PATCH edita (cada ítem con su ``id``) y
+        DELETE elimina (lista de ids). El cuerpo es la lista o
+        ``{"items": [...], "partial": false}``. Sin ``partial`` cualquier error
+        cancela todo el lote; con él se aplican los ítems válidos. La
+        respuesta trae el resultado de cada ítem en el mismo orden.
+        """
+        payload, partial = parse_payload(request.data, 'items', 'items es requerido (lista de equipos)')
+        if request.method == 'DELETE':
+            return self._bulk_delete(payload, partial)
+
+        context = {**self.get_serializer_context(), 'allow_partial': partial}
+        instances = None
+        if request.method == 'PATCH':
+            instances = list(load_equipos(item_id(item) for item in payload).values())
+        serializer = EquiposSerializer(
+            instances, data=payload, many=True, partial=request.method == 'PATCH', context=context,
+        )
+
+        with transaction.atomic():
+            if not serializer.is_valid():
+                return batch_response(self._bulk_results(serializer.item_errors), cancelled=True)
+            equipos = serializer.save()
+        return batch_response(self._bulk_results(serializer.item_errors, [equipo.pk for equipo in equipos]))
+
+    def _bulk_delete(self, payload, partial):
+        ids = [item_id(item) for item in payload]
+        errors = [{} if pk is not None else {'id': ['Id inválido.']} for pk in ids]
+
+        with transaction.atomic():
+            existing = load_equipos(ids, 'id')
+            for pk, item_errors in zip(ids, errors):
+                if pk is not None and pk not in existing:
+                    item_errors['id'] = ['Equipo no encontrado.']
+            if any(errors) and not partial:
+                return batch_response(self._bulk_results(errors), cancelled=True)
+            Equipos.objects.filter(pk__in=existing).delete()
+        return batch_response(self._bulk_results(errors, [pk for pk, e in zip(ids, errors) if not e]))
+
+    def _bulk_results(self, errors, ids=None):
+        """Resultado por ítem; ``ids`` son los de los ítems aplicados, en orden."""
+        applied = iter(ids or ())
+        results = []
+        for index, item_errors in enumerate(errors):
+            if item_errors:
+                results.append({'index': index, 'errors': item_errors})
+            elif ids is None:
+                # El lote se canceló: el ítem era válido pero no se aplicó
+                results.append({'index': index})
+            else:
+                results.append({'index': index, 'id': next(applied)})
+        return results
+
+    @action(detail=False, methods=['get'], url_path='search')
+    def full_text_search(self, request):
+        """
+        Búsqueda de texto completo (``?q=``) en nombre, marca, modelo, serie,
+        códigos, proveedor y ubicación, ordenada por relevancia. Admite los
+        filtros del listado (status, site, ...) y se pagina con
+        ``limit``/``offset``. Si no hay coincidencias, o con ``?fuzzy=1``, la
+        búsqueda es aproximada (tolera tildes y errores de tipeo).
+        """
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response({'error': 'q es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+        columns = [f for f in EquiposListSerializer.Meta.fields if f != 'display']
+        queryset = EquiposFilterBackend().filter_queryset(request, Equipos.objects.only(*columns, *KEY_COLUMNS), self)
+        results = search(queryset, text)
+        # Sin coincidencias exactas (o con ?fuzzy=1) se toleran errores de tipeo
+        if request.query_params.get('fuzzy', '').lower() in ('1', 'true') or not results.exists():
+            results = fuzzy_search(queryset, text)
+        paginator = SearchPagination()
+        page = paginator.paginate_queryset(results, request)
+        serializer = EquiposListSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'], url_path=r'history/(?P<kind>transfers|decommissions|maintenance)')
+    def history(self, request, pk=None, kind=None):
+        """
+        Historial de traslados, bajas o mantenimientos de un equipo, del más
+        reciente al más antiguo, paginado por cursor. En ``maintenance``,
+        ``?type=maintenance|calibration`` filtra por tipo.
+        """
+        equipo = get_object_or_404(Equipos.objects.only('id'), pk=pk)
+        model, serializer_class = HISTORY_MODELS[kind]
+        queryset = model.objects.filter(equipo_id=equipo.pk)
+        if kind == 'maintenance' and request.query_params.get('type') in EVENT_FIELDS:
+            queryset = queryset.filter(type=request.query_params['type'])
+        paginator = HistoryPagination()
+        # Sin la vista: el orden es el del paginador, no el del listado
+        page = paginator.paginate_queryset(queryset, request)
+        return paginator.get_paginated_response(serializer_class(page, many=True).data)
+
+    @action(detail=True, methods=['post'])
+    def decommission(self, request, pk=None):
+        """
+        Da de baja un equipo y lo registra en el historial.
+        Requiere: reason; date (YYYY-MM-DD) es opcional, por defecto hoy.
+        """
+        reason = (request.data.get('reason') or '').strip()
+        if not reason:
+            return Response({'error': 'reason es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            decommission_date = date.fromisoformat(request.data.get('date') or date.today().isoformat())
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'Formato de fecha inválido. Use YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            equipo = get_object_or_404(Equipos.objects.select_for_update(), pk=pk)
+            if equipo.status != 'Activo':
+                return Response(
+                    {'error': 'Solo se pueden dar de baja equipos activos'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            equipo.status = 'Inactivo'
+            equipo.save(update_fields=['status'])
+            record = EquipoDecommission.objects.create(
+                equipo=equipo, inventory_code=equipo.inventory_code,
+                date=decommission_date, reason=reason, user_id=history_user_id(request),
+            )
+        return Response(EquipoDecommissionSerializer(record).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def transfer(self, request):
+        """
+        Traslado de uno o varios equipos. Recibe un ítem o
+        ``{"items": [{"equipment_id", "site", "service", "responsible",
+        "justification", "signature", "date"}, ...], "partial": false}``.
+        ``responsible``, ``signature`` y ``date`` son opcionales. Se valida
+        el lote completo; equipos y relaciones se cargan con una consulta por
+        tabla y todo se escribe en una transacción.
+        """
+        payload, partial = parse_payload(
+            request.data, 'items', 'items es requerido (lista de traslados)', single=True,
+        )
+
+        # Validación de forma de cada ítem
+        results = []
+        items = []
+        for index, item in enumerate(payload):
+            result = {'index': index}
+            results.append(result)
+            if not isinstance(item, dict):
+                result['error'] = 'Cada traslado debe ser un objeto'
+                continue
+            result['equipment_id'] = item.get('equipment_id')
+            try:
+                ids = {key: int(item[key]) for key in ('equipment_id', 'site', 'service')}
+                ids['responsible'] = int(item['responsible']) if item.get('responsible') else None
+            except (KeyError, TypeError, ValueError):
+                result['error'] = 'equipment_id, site y service son requeridos'
+                continue
+            justification = (item.get('justification') or '').strip()
+            if not justification:
+                result['error'] = 'justification es requerido'
+                continue
+            try:
+                transfer_date = date.fromisoformat(item.get('date') or date.today().isoformat())
+            except (TypeError, ValueError):
+                result['error'] = 'Formato de fecha inválido. Use YYYY-MM-DD'
+                continue
+            items.append((result, ids, justification, item.get('signature') or '', transfer_date))
+
+        with transaction.atomic():
+            equipos = load_equipos({ids['equipment_id'] for _, ids, *_ in items}, for_update=True)
+            sedes = Sede.objects.in_bulk({ids['site'] for _, ids, *_ in items})
+            servicios = Servicio.objects.in_bulk({ids['service'] for _, ids, *_ in items})
+            responsables = Responsable.objects.in_bulk(
+                {ids['responsible'] for _, ids, *_ in items if ids['responsible']}
+            )
+
+            # Validación contra la base de datos y entre ítems
+            seen = set()
+            for result, ids, *_ in items:
+                equipo = equipos.get(ids['equipment_id'])
+                servicio = servicios.get(ids['service'])
+                if equipo is None:
+                    result['error'] = 'Equipo no encontrado'
+                elif equipo.status != 'Activo':
+                    result['error'] = 'Solo se pueden trasladar equipos activos'
+                elif ids['site'] not in sedes:
+                    result['error'] = 'Sede no encontrada'
+                elif servicio is None or servicio.sede_id != ids['site']:
+                    result['error'] = 'El servicio no pertenece a la sede de destino'
+                elif ids['responsible'] and ids['responsible'] not in responsables:
+                    result['error'] = 'Responsable no encontrado'
+                elif ids['equipment_id'] in seen:
+                    result['error'] = 'El equipo está repetido en la lista'
+                seen.add(ids['equipment_id'])
+
+            if not partial and any(is_failed(result) for result in results):
+                # Nada se guarda: los ítems válidos también quedan sin aplicar
+                return batch_response(results, 'transferred', cancelled=True)
+
+            now = timezone.now()
+            user_id = history_user_id(request)
+            records = []
+            for result, ids, justification, signature, transfer_date in items:
+                if 'error' in result:
+                    continue
+                equipo = equipos[ids['equipment_id']]
+                records.append(EquipoTransfer(
+                    equipo=equipo, inventory_code=equipo.inventory_code, timestamp=now, user_id=user_id,
+                    from_site_id=equipo.site_id, from_service_id=equipo.service_id,
+                    from_responsible_id=equipo.responsible_id,
+                    to_site_id=ids['site'], to_service_id=ids['service'],
+                    to_responsible_id=ids['responsible'] or equipo.responsible_id,
+                    date=transfer_date, justification=justification, signature=signature,
+                ))
+                equipo.site_id = ids['site']
+                equipo.service_id = ids['service']
+                equipo.responsible_id = ids['responsible'] or equipo.responsible_id
+            update_equipos((equipos[record.equipo_id], {'site', 'service', 'responsible'}) for record in records)
+            EquipoTransfer.objects.bulk_create(records)
+        return batch_response(results, 'transferred')
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Sincronización incremental: equipos creados o modificados y ids
+        eliminados desde ``?since=<cursor>``. Sin ``since`` devuelve el
+        inventario completo. El cliente guarda el ``cursor`` de la respuesta
+        para la siguiente llamada; un mismo cambio puede llegar dos veces, así
+        que debe aplicarse por id.
+        """
+        # updated_at (y deleted_at) se fija al escribir, no al confirmar: una
+        # transacción que marcó sus filas antes de esta lectura puede
+        # confirmarse después. El cursor retrocede SYNC_CURSOR_OVERLAP_SECONDS
+        # (más que la transacción más larga y que el retraso de las réplicas)
+        # para que esas filas lleguen en la próxima sincronización.
+        cursor = timezone.now() - timedelta(seconds=settings.SYNC_CURSOR_OVERLAP_SECONDS)
+        since = request.query_params.get('since')
+        queryset = self.get_queryset()
+        deleted = []
+        if since:
+            since = parse_datetime(since)
+            if since is None:
+                return Response(
+                    {'error': 'El parámetro since debe ser un cursor devuelto por este endpoint'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            queryset = queryset.filter(updated_at__gte=since)
+            deleted = list(
+                EquipoTombstone.objects.filter(deleted_at__gte=since)
+                .values_list('equipo_id', flat=True).distinct()
+            )
+
+        serializer = self.get_serializer(queryset.order_by('updated_at', 'id'), many=True)
+        # Un id recreado después de borrarse no se informa como eliminado.
+        updated_ids = {row['id'] for row in serializer.data if 'id' in row}
+        return Response({
+            # En UTC con 'Z', sin '+' que haya que escapar en la URL
+            'cursor': cursor.isoformat().replace('+00:00', 'Z'),
+            'updated': serializer.data,
+            'deleted': [pk for pk in deleted if pk not in updated_ids],
+        })
 
 
 def get_maintenance_status(days_remaining):
@@ -66,80 +400,129 @@ def get_maintenance_status(days_remaining):
         return 'upcoming'  # Próximo pero no urgente
 
 
+# Campos que definen cada tipo de evento: (frecuencia, última fecha, próxima fecha)
+EVENT_FIELDS = {
+    'maintenance': ('maintenance_frequency', 'last_maintenance_date', 'next_maintenance_date'),
+    'calibration': ('calibration_frequency', 'last_calibration_date', 'next_calibration_date'),
+}
+
+EVENT_COLUMNS = (
+    'id', 'name', 'inventory_code', 'site_id', 'service_id', 'responsible_id',
+    'event_type', 'event_last_date', 'event_frequency', 'next_date', 'days_remaining',
+)
+
+# Ventanas de días restantes para cada estado de get_maintenance_status
+EVENT_STATUS_FILTERS = {
+    'overdue': Q(days_remaining__lt=0),
+    'due': Q(days_remaining__gte=0, days_remaining__lte=30),
+    'upcoming': Q(days_remaining__gt=30),
+}
+
+
+def maintenance_events_queryset(event_type, today):
+    """
+    Eventos de un tipo ('maintenance' o 'calibration') calculados en la base de
+    datos a partir de la próxima fecha almacenada (indexada); los días
+    restantes quedan como anotación.
+    """
+    frequency, last_date, next_date = EVENT_FIELDS[event_type]
+    return (
+        Equipos.objects
+        .filter(status='Activo', **{f'{next_date}__isnull': False})
+        .annotate(
+            event_type=Value(event_type, output_field=CharField()),
+            event_last_date=Coalesce(last_date, 'acquisition_date'),
+            event_frequency=F(frequency),
+            next_date=F(next_date),
+        )
+        .annotate(days_remaining=DaysBetween(Value(today, output_field=DateField()), 'next_date'))
+    )
+
+
+def filter_maintenance_events(params, today):
+    """
+    Eventos de maintenance_events según sus parámetros, ordenados por
+    urgencia. ``ValueError`` si una fecha del rango es inválida.
+    """
+    types = [t for t in params.get('type', '').split(',') if t in EVENT_FIELDS] or list(EVENT_FIELDS)
+    statuses = [s for s in params.get('status', '').split(',') if s in EVENT_STATUS_FILTERS]
+
+    filters = Q()
+    for param in ('site', 'service', 'responsible'):
+        value = params.get(param)
+        if value and value.isdigit():
+            filters &= Q(**{f'{param}_id': int(value)})
+    for param, lookup in (('from', 'next_date__gte'), ('to', 'next_date__lte')):
+        if params.get(param):
+            try:
+                filters &= Q(**{lookup: date.fromisoformat(params[param])})
+            except ValueError:
+                raise ValueError(f'Formato de fecha inválido en {param}. Use YYYY-MM-DD') from None
+    if statuses:
+        status_filter = Q()
+        for s in statuses:
+            status_filter |= EVENT_STATUS_FILTERS[s]
+        filters &= status_filter
+
+    querysets = [
+        maintenance_events_queryset(event_type, today).filter(filters).values(*EVENT_COLUMNS)
+        for event_type in types
+    ]
+    events = querysets[0].union(*querysets[1:], all=True) if len(querysets) > 1 else querysets[0]
+    return events.order_by('days_remaining', 'id', 'event_type')
+
+
+def _event_from_row(row):
+    return {
+        'id': f"{row['id']}-{row['event_type']}",
+        'equipmentId': str(row['id']),
+        'equipmentName': row['name'],
+        'inventoryCode': row['inventory_code'],
+        'type': row['event_type'],
+        'lastDate': row['event_last_date'].isoformat(),
+        'nextDate': row['next_date'].isoformat(),
+        'frequency': row['event_frequency'],
+        'daysRemaining': row['days_remaining'],
+        'status': get_maintenance_status(row['days_remaining']),
+        'siteId': row['site_id'],
+        'serviceId': row['service_id'],
+        'responsibleId': row['responsible_id'],
+    }
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def maintenance_events(request):
     """
     Endpoint para obtener eventos de mantenimiento y calibración calculados.
-    Retorna una lista de eventos con información sobre próximos mantenimientos.
+    Retorna una lista de eventos con información sobre próximos mantenimientos,
+    ordenada por urgencia (vencidos primero, luego por días restantes).
+
+    Filtros opcionales: type, status (overdue,due,upcoming), site, service,
+    responsible, from / to (rango de la próxima fecha, YYYY-MM-DD).
+    Con ``limit`` (y ``offset``) la respuesta se pagina.
     """
-    # Filtrar solo equipos activos
-    equipos = Equipos.objects.filter(status='Activo')
-    
-    events = []
-    
-    for equipo in equipos:
-        # Generar evento de mantenimiento si está configurado
-        if equipo.maintenance_required and equipo.maintenance_frequency:
-            last_maintenance_date = equipo.last_maintenance_date or equipo.acquisition_date
-            
-            if last_maintenance_date:
-                next_maintenance_date = calculate_next_date(last_maintenance_date, equipo.maintenance_frequency)
-                
-                if next_maintenance_date:
-                    days_remaining = calculate_days_remaining(next_maintenance_date)
-                    status_event = get_maintenance_status(days_remaining)
-                    
-                    events.append({
-                        'id': f'{equipo.id}-maintenance',
-                        'equipmentId': str(equipo.id),
-                        'equipmentName': equipo.name,
-                        'inventoryCode': equipo.inventory_code,
-                        'type': 'maintenance',
-                        'lastDate': last_maintenance_date.isoformat() if last_maintenance_date else '',
-                        'nextDate': next_maintenance_date.isoformat(),
-                        'frequency': equipo.maintenance_frequency,
-                        'daysRemaining': days_remaining if days_remaining is not None else 0,
-                        'status': status_event,
-                        'siteId': equipo.site.id if equipo.site else None,
-                        'serviceId': equipo.service.id if equipo.service else None,
-                        'responsibleId': equipo.responsible.id if equipo.responsible else None,
-                    })
-        
-        # Generar evento de calibración si está configurado
-        if equipo.calibration_required and equipo.calibration_frequency:
-            last_calibration_date = equipo.last_calibration_date or equipo.acquisition_date
-            
-            if last_calibration_date:
-                next_calibration_date = calculate_next_date(last_calibration_date, equipo.calibration_frequency)
-                
-                if next_calibration_date:
-                    days_remaining = calculate_days_remaining(next_calibration_date)
-                    status_event = get_maintenance_status(days_remaining)
-                    
-                    events.append({
-                        'id': f'{equipo.id}-calibration',
-                        'equipmentId': str(equipo.id),
-                        'equipmentName': equipo.name,
-                        'inventoryCode': equipo.inventory_code,
-                        'type': 'calibration',
-                        'lastDate': last_calibration_date.isoformat() if last_calibration_date else '',
-                        'nextDate': next_calibration_date.isoformat(),
-                        'frequency': equipo.calibration_frequency,
-                        'daysRemaining': days_remaining if days_remaining is not None else 0,
-                        'status': status_event,
-                        'siteId': equipo.site.id if equipo.site else None,
-                        'serviceId': equipo.service.id if equipo.service else None,
-                        'responsibleId': equipo.responsible.id if equipo.responsible else None,
-                    })
-    
-    # Ordenar eventos por urgencia (más urgentes primero)
-    events.sort(key=lambda x: (
-        0 if x['daysRemaining'] < 0 else 1,  # Vencidos primero
-        x['daysRemaining']  # Luego por días restantes
-    ))
-    
-    return Response(events)
+    # Los días restantes cambian cada día aunque los equipos no cambien
+    today = date.today()
+    etag = make_etag(request, equipos_state(references=False), today)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    try:
+        events = filter_maintenance_events(request.query_params, today)
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    paginator = MaintenanceEventsPagination()
+    page = paginator.paginate_queryset(events, request)
+    if page is not None:
+        response = paginator.get_paginated_response([_event_from_row(row) for row in page])
+    else:
+        response = Response([_event_from_row(row) for row in events])
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
 
 
 @api_view(['POST'])
@@ -186,8 +569,13 @@ def update_maintenance_date(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    equipment.last_maintenance_date = maintenance_date
-    equipment.save()
+    with transaction.atomic():
+        equipment.last_maintenance_date = maintenance_date
+        equipment.save(update_fields=['last_maintenance_date'])
+        EquipoMaintenanceRecord.objects.create(
+            equipo=equipment, inventory_code=equipment.inventory_code,
+            type='maintenance', date=maintenance_date, user_id=history_user_id(request),
+        )
     
     return Response({
         'success': True,
@@ -240,11 +628,119 @@ def update_calibration_date(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    equipment.last_calibration_date = calibration_date
-    equipment.save()
+    with transaction.atomic():
+        equipment.last_calibration_date = calibration_date
+        equipment.save(update_fields=['last_calibration_date'])
+        EquipoMaintenanceRecord.objects.create(
+            equipo=equipment, inventory_code=equipment.inventory_code,
+            type='calibration', date=calibration_date, user_id=history_user_id(request),
+        )
     
     return Response({
         'success': True,
         'equipment_id': equipment.id,
         'last_calibration_date': calibration_date.isoformat()
     })
+
+
+BULK_DATE_LABELS = {'maintenance': 'mantenimiento', 'calibration': 'calibración'}
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def bulk_update_dates(request):
+    """
+    Registra en una sola llamada las fechas de último mantenimiento o
+    calibración de varios equipos.
+
+    Recibe ``{"updates": [{"equipment_id": 1, "type": "maintenance",
+    "date": "YYYY-MM-DD"}, ...], "partial": false}`` (o directamente la
+    lista). Los ítems se validan en conjunto: con algún error no se guarda
+    nada, salvo con ``partial`` que guarda los válidos. Todo se escribe en una
+    transacción con ``bulk_update`` de solo las columnas de fechas, y cada
+    fecha queda en el historial de mantenimientos. La respuesta trae el
+    resultado de cada ítem en el mismo orden.
+    """
+    payload, partial = parse_payload(
+        request.data, 'updates', 'updates es requerido (lista de {equipment_id, type, date})',
+    )
+
+    # Validación de forma de cada ítem
+    results = []
+    items = []
+    for index, item in enumerate(payload):
+        result = {'index': index}
+        results.append(result)
+        if not isinstance(item, dict):
+            result['error'] = 'Cada actualización debe ser un objeto'
+            continue
+        result.update(equipment_id=item.get('equipment_id'), type=item.get('type'))
+        equipment_id = item_id(item, 'equipment_id')
+        if equipment_id is None:
+            result['error'] = 'equipment_id es requerido'
+            continue
+        if item.get('type') not in EVENT_FIELDS:
+            result['error'] = 'type debe ser maintenance o calibration'
+            continue
+        try:
+            event_date = date.fromisoformat(str(item.get('date')))
+        except ValueError:
+            result['error'] = 'Formato de fecha inválido. Use YYYY-MM-DD'
+            continue
+        items.append((result, equipment_id, item['type'], event_date))
+
+    with transaction.atomic():
+        equipos = load_equipos(
+            {equipment_id for _, equipment_id, _, _ in items},
+            'id', 'status', 'inventory_code', 'acquisition_date',
+            'maintenance_required', 'maintenance_frequency', 'last_maintenance_date',
+            'calibration_required', 'calibration_frequency', 'last_calibration_date',
+            for_update=True,
+        )
+
+        # Validación contra la base de datos y entre ítems
+        seen = set()
+        for result, equipment_id, event_type, event_date in items:
+            equipment = equipos.get(equipment_id)
+            if equipment is None:
+                result['error'] = 'Equipo no encontrado'
+            elif equipment.status != 'Activo':
+                result['error'] = (
+                    f'Solo se puede actualizar la fecha de {BULK_DATE_LABELS[event_type]} para equipos activos'
+                )
+            elif (equipment_id, event_type) in seen:
+                result['error'] = 'La actualización está repetida en la lista'
+            seen.add((equipment_id, event_type))
+
+        if not partial and any(is_failed(result) for result in results):
+            # Nada se guarda: los ítems válidos también quedan sin aplicar
+            return batch_response(results, 'updated', cancelled=True)
+
+        changed = {}
+        records = []
+        applied = []
+        # Un solo UPDATE: todos los equipos escriben las mismas columnas
+        fields = set()
+        now = timezone.now()
+        user_id = history_user_id(request)
+        for result, equipment_id, event_type, event_date in items:
+            if 'error' in result:
+                continue
+            _, last_field, next_field = EVENT_FIELDS[event_type]
+            equipment = equipos[equipment_id]
+            records.append(EquipoMaintenanceRecord(
+                equipo_id=equipment_id, inventory_code=equipment.inventory_code,
+                timestamp=now, type=event_type, date=event_date, user_id=user_id,
+            ))
+            setattr(equipment, last_field, event_date)
+            changed[equipment_id] = equipment
+            fields.add(last_field)
+            result[last_field] = event_date.isoformat()
+            applied.append((result, equipment, next_field))
+        update_equipos((equipment, fields) for equipment in changed.values())
+        EquipoMaintenanceRecord.objects.bulk_create(records)
+
+    for result, equipment, next_field in applied:
+        next_date = getattr(equipment, next_field)
+        result[next_field] = next_date.isoformat() if next_date else None
+    return batch_response(results, 'updated')
@@ -0,0 +1,35 @@
+# Generated by Django 4.2 on 2026-10-17 12:45
+
+import unicodedata
+from django.db import migrations, models
+
+
+def _search_key(value):
+    # Copia congelada de backend_lime.text.search_key
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    folded = ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+    return ' '.join(folded.split())[:200]
+
+
+def fill_name_key(apps, schema_editor):
+    Responsable = apps.get_model('responsables', 'Responsable')
+    responsables = list(Responsable.objects.only('id', 'name'))
+    for responsable in responsables:
+        responsable.name_key = _search_key(responsable.name)
+    Responsable.objects.bulk_update(responsables, ['name_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('responsables', '0002_rename_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='responsable',
+            name='name_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=200),
+        ),
+        migrations.RunPython(fill_name_key, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,20 @@
 from django.db import models
+from backend_lime.text import search_key
 
 
 class Responsable(models.Model):
 	# normalized names
 	name = models.CharField(max_length=200)
 	role = models.CharField(max_length=150, blank=True)
+	# clave de búsqueda sin tildes ni mayúsculas, ver backend_lime.text
+	name_key = models.CharField(max_length=200, blank=True, default='', editable=False, db_index=True)
 
 	def __str__(self):
 		return f"{self.name} - {self.role}" if self.role else self.name
+
+	def save(self, *args, **kwargs):
+		self.name_key = search_key(self.name, 200)
+		update_fields = kwargs.get('update_fields')
+		if update_fields is not None and 'name' in update_fields:
+			kwargs['update_fields'] = {*update_fields, 'name_key'}
+		super().save(*args, **kwargs)
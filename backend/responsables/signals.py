@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from backend_lime.reference_cache import invalidate
+from .models import Responsable
+
+
+@receiver(post_save, sender=Responsable)
+@receiver(post_delete, sender=Responsable)
+def invalidate_reference_cache(sender, **kwargs):
+    """Descarta el listado de responsables en caché."""
+    invalidate(sender)
@@ -1,11 +1,12 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from users.permissions import IsAdminOrReadOnly
+from backend_lime.reference_cache import ReferenceCacheMixin
 from .models import Responsable
 from .serializers import ResponsablesSerializer
 
 
-class ResponsablesViewSet(viewsets.ModelViewSet):
+class ResponsablesViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
 	queryset = Responsable.objects.all()
 	serializer_class = ResponsablesSerializer
 	permission_classes = [IsAuthenticated, IsAdminOrReadOnly]
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from backend_lime.reference_cache import invalidate
+from .models import Sede
+
+
+@receiver(post_save, sender=Sede)
+@receiver(post_delete, sender=Sede)
+def invalidate_reference_cache(sender, **kwargs):
+    """Descarta el listado de sedes en caché."""
+    invalidate(sender)
@@ -1,3 +1,51 @@
+from django.contrib.auth.models import User, Group
+from django.core.cache import caches
 from django.test import TestCase
+from rest_framework.test import APIClient
+from responsables.models import Responsable
+from .models import Sede
+
+
+class ReferenceCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        admin_group, _ = Group.objects.get_or_create(name='Administrador')
+        cls.admin = User.objects.create_user(username='admin', password='x')
+        cls.admin.groups.add(admin_group)
+        Sede.objects.create(nombre_sede='Sede Norte')
+
+    def setUp(self):
+        caches['reference'].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_repeated_reads_skip_the_database(self):
+        res = self.client.get('/api/sedes/')
+        self.assertEqual(res['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            res = self.client.get('/api/sedes/')
+            cached = self.client.get('/api/sedes/', HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res['X-Cache'], 'HIT')
+        self.assertEqual([s['name'] for s in res.data], ['Sede Norte'])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_writes_invalidate_the_list(self):
+        etag = self.client.get('/api/sedes/')['ETag']
+        self.client.post('/api/sedes/', {'name': 'Sede Sur'})
+        res = self.client.get('/api/sedes/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.data), 2)
+
+        Sede.objects.filter(nombre_sede='Sede Sur').delete()
+        self.assertEqual(len(self.client.get('/api/sedes/').data), 1)
+
+    def test_hit_rate_metric(self):
+        for _ in range(3):
+            self.client.get('/api/sedes/')
+        Responsable.objects.create(name='Ana', role='')
+        self.client.get('/api/responsables/')
+        stats = self.client.get('/api/cache/reference/').data['models']
+        self.assertEqual(stats['sedes.sede'], {'hits': 2, 'misses': 1, 'hit_rate': 0.6667})
+        self.assertEqual(stats['responsables.responsable']['misses'], 1)
 
-# Create your tests here.
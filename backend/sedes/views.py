@@ -1,11 +1,12 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from users.permissions import IsAdminOrReadOnly
+from backend_lime.reference_cache import ReferenceCacheMixin
 from .models import Sede
 from .serializers import SedesSerializer
 
 
-class SedesViewSet(viewsets.ModelViewSet):
+class SedesViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
 	queryset = Sede.objects.all()
 	serializer_class = SedesSerializer
 	permission_classes = [IsAuthenticated, IsAdminOrReadOnly]
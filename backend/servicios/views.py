@@ -1,11 +1,12 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from users.permissions import IsAdminOrReadOnly
+from backend_lime.reference_cache import ReferenceCacheMixin
 from .models import Servicio
 from .serializers import ServiciosSerializer
 
 
-class ServiciosViewSet(viewsets.ModelViewSet):
+class ServiciosViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
 	queryset = Servicio.objects.all()
 	serializer_class = ServiciosSerializer
 	permission_classes = [IsAuthenticated, IsAdminOrReadOnly]
@@ -0,0 +1,59 @@
+import time
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+# Lista de bloqueo de tokens en la caché 'tokens' (base de datos o Redis, ver
+# settings): compartida por todos los procesos y persistente. Cada entrada
+# expira junto con el token revocado.
+TOKEN_CACHE = 'tokens'
+REVOKED_TOKEN_KEY = 'users:revoked-jti:{}'
+REVOKED_USER_KEY = 'users:revoked-before:{}'
+
+
+def revoke_token(token):
+    """Revoca un token (access o refresh) hasta su expiración."""
+    remaining = int(token['exp'] - time.time())
+    if remaining > 0:
+        caches[TOKEN_CACHE].set(REVOKED_TOKEN_KEY.format(token[api_settings.JTI_CLAIM]), True, remaining)
+
+
+def revoke_user_tokens(user_id):
+    """Revoca todos los tokens emitidos hasta ahora para un usuario."""
+    lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+    caches[TOKEN_CACHE].set(REVOKED_USER_KEY.format(user_id), int(time.time()), int(lifetime.total_seconds()))
+
+
+def is_token_revoked(token):
+    jti_key = REVOKED_TOKEN_KEY.format(token.get(api_settings.JTI_CLAIM))
+    user_key = REVOKED_USER_KEY.format(token.get(api_settings.USER_ID_CLAIM))
+    found = caches[TOKEN_CACHE].get_many([jti_key, user_key])
+    if found.get(jti_key):
+        return True
+    revoked_before = found.get(user_key)
+    return revoked_before is not None and token.get('iat', 0) <= revoked_before
+
+
+class RevocationCheckMixin:
+    """Rechaza los tokens que están en la lista de bloqueo."""
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if is_token_revoked(token):
+            raise InvalidToken(_('Token has been revoked'))
+        return token
+
+
+class RevocableJWTAuthentication(RevocationCheckMixin, JWTAuthentication):
+    """Autenticación JWT por defecto (carga el User) con soporte de revocación."""
+
+
+class StatelessJWTAuthentication(RevocationCheckMixin, JWTStatelessUserAuthentication):
+    """
+    Autenticación JWT sin cargar el User: ``request.user`` es un TokenUser
+    construido con los claims que agrega CustomTokenObtainPairSerializer
+    (``user_id``, ``username`` y ``role``). Se activa con JWT_STATELESS_AUTH,
+    que exige la caché 'tokens' en Redis para no consultar la base de datos.
+    """
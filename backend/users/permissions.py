@@ -1,5 +1,49 @@
 from rest_framework import permissions
-from django.contrib.auth.models import Group
+from rest_framework_simplejwt.models import TokenUser
+from django.core.cache import caches
+
+ADMIN_GROUP = 'Administrador'
+READER_GROUP = 'Lector'
+
+# El rol resuelto de cada usuario se guarda en la caché compartida 'roles'
+# (base de datos o Redis, ver settings), la misma para todos los procesos: las
+# señales de users/signals.py lo invalidan cuando cambia la pertenencia a
+# grupos, y el cambio lo ven todos los procesos. Cada entrada guarda la
+# generación con la que se resolvió; invalidate_all_roles la incrementa.
+ROLE_CACHE = 'roles'
+ROLE_CACHE_TIMEOUT = 300
+ROLE_CACHE_GENERATION_KEY = 'users:role:generation'
+ROLE_CACHE_KEY = 'users:role:{}'
+
+
+def invalidate_user_role(user_id):
+    """Descarta el rol en caché de un usuario."""
+    caches[ROLE_CACHE].delete(ROLE_CACHE_KEY.format(user_id))
+
+
+def invalidate_all_roles():
+    """Descarta el rol en caché de todos los usuarios (p. ej. al renombrar un grupo)."""
+    try:
+        caches[ROLE_CACHE].incr(ROLE_CACHE_GENERATION_KEY)
+    except ValueError:
+        caches[ROLE_CACHE].set(ROLE_CACHE_GENERATION_KEY, 1, None)
+
+
+def get_request_role(request):
+    """
+    Rol del usuario de la petición. Se usa primero el claim ``role`` que
+    CustomTokenObtainPairSerializer incluye en el JWT (cero consultas); si la
+    petición no trae token con rol se resuelve con get_user_role.
+
+    El claim refleja el rol al emitir el token. Por eso quitar a un usuario de
+    un grupo revoca sus tokens (users/signals.py), y la renovación vuelve a
+    resolver el rol en la base de datos (CustomTokenRefreshSerializer).
+    """
+    token = getattr(request, 'auth', None)
+    role = token.get('role') if hasattr(token, 'get') else None
+    if role in ('admin', 'reader'):
+        return role
+    return get_user_role(request.user)
 
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -16,17 +60,13 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         
         # Para métodos de escritura, verificar si el usuario es administrador
         if request.user and request.user.is_authenticated:
-            return self._is_admin(request.user)
+            return self._is_admin(request)
         
         return False
     
-    def _is_admin(self, user):
+    def _is_admin(self, request):
         """Verifica si el usuario pertenece al grupo 'Administrador'"""
-        try:
-            admin_group = Group.objects.get(name='Administrador')
-            return admin_group in user.groups.all()
-        except Group.DoesNotExist:
-            return False
+        return get_request_role(request) == 'admin'
 
 
 class IsAdmin(permissions.BasePermission):
@@ -36,16 +76,12 @@ class IsAdmin(permissions.BasePermission):
     
     def has_permission(self, request, view):
         if request.user and request.user.is_authenticated:
-            return self._is_admin(request.user)
+            return self._is_admin(request)
         return False
     
-    def _is_admin(self, user):
+    def _is_admin(self, request):
         """Verifica si el usuario pertenece al grupo 'Administrador'"""
-        try:
-            admin_group = Group.objects.get(name='Administrador')
-            return admin_group in user.groups.all()
-        except Group.DoesNotExist:
-            return False
+        return get_request_role(request) == 'admin'
 
 
 def get_user_role(user):
@@ -55,18 +91,32 @@ def get_user_role(user):
     """
     if not user or not user.is_authenticated:
         return None
-    
-    try:
-        admin_group = Group.objects.get(name='Administrador')
-        reader_group = Group.objects.get(name='Lector')
-        
-        if admin_group in user.groups.all():
-            return 'admin'
-        elif reader_group in user.groups.all():
-            return 'reader'
-        else:
-            return None
-    except Group.DoesNotExist:
-        return None
+
+    # Usuario construido desde el JWT (autenticación sin estado)
+    if isinstance(user, TokenUser):
+        return user.token.get('role')
+
+    # Memoizado en el objeto (por petición) y en la caché compartida
+    if hasattr(user, '_role'):
+        return user._role
+
+    key = ROLE_CACHE_KEY.format(user.pk)
+    found = caches[ROLE_CACHE].get_many([ROLE_CACHE_GENERATION_KEY, key])
+    generation = found.get(ROLE_CACHE_GENERATION_KEY, 0)
+    cached_generation, role = found.get(key, (None, None))
+    if cached_generation != generation:
+        role = resolve_user_role(user) or ''
+        caches[ROLE_CACHE].set(key, (generation, role), ROLE_CACHE_TIMEOUT)
+
+    user._role = role or None
+    return user._role
 
 
+def resolve_user_role(user):
+    """Rol del usuario según sus grupos en la base de datos, sin caché."""
+    groups = set(user.groups.filter(name__in=[ADMIN_GROUP, READER_GROUP]).values_list('name', flat=True))
+    if ADMIN_GROUP in groups:
+        return 'admin'
+    if READER_GROUP in groups:
+        return 'reader'
+    return None
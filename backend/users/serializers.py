@@ -1,7 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User, Group
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from .permissions import get_user_role
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import is_token_revoked
+from .permissions import get_user_role, resolve_user_role
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -126,3 +130,21 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         return data
 
 
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Serializer de renovación que rechaza refresh tokens revocados y vuelve a
+    resolver el rol: simplejwt copia los claims del refresh token al nuevo
+    access token, y el ``role`` del refresh es el del momento del login.
+    """
+
+    def validate(self, attrs):
+        refresh = RefreshToken(attrs['refresh'])
+        if is_token_revoked(refresh):
+            raise InvalidToken('El token fue revocado')
+        user = User.objects.filter(pk=refresh[api_settings.USER_ID_CLAIM], is_active=True).first()
+        if user is None:
+            raise InvalidToken('El usuario no existe o está inactivo')
+        refresh['role'] = resolve_user_role(user)
+        return super().validate({**attrs, 'refresh': str(refresh)})
+
+
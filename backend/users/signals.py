@@ -0,0 +1,82 @@
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_migrate, pre_save
+from django.dispatch import receiver
+from .authentication import revoke_user_tokens
+from .permissions import ADMIN_GROUP, READER_GROUP, invalidate_all_roles, invalidate_user_role
+
+ROLE_GROUPS = (ADMIN_GROUP, READER_GROUP)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_role_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalida el rol en caché cuando cambian los grupos de un usuario."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        # user.groups.add(...) / remove(...) / clear()
+        invalidate_user_role(instance.pk)
+    elif pk_set:
+        # group.user_set.add(...) / remove(...)
+        for user_id in pk_set:
+            invalidate_user_role(user_id)
+    else:
+        # group.user_set.clear(): no se sabe qué usuarios estaban
+        invalidate_all_roles()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def revoke_tokens_on_membership_removal(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    El rol viaja en el JWT: quitar a un usuario de un grupo de rol revoca los
+    tokens emitidos con el rol anterior (agregarlo solo amplía permisos y se
+    aplica al renovar el token).
+    """
+    if action not in ('pre_remove', 'pre_clear'):
+        return
+    if not reverse:
+        groups = instance.groups.all() if pk_set is None else Group.objects.filter(pk__in=pk_set)
+        if groups.filter(name__in=ROLE_GROUPS).exists():
+            revoke_user_tokens(instance.pk)
+    elif instance.name in ROLE_GROUPS:
+        user_ids = instance.user_set.values_list('pk', flat=True) if pk_set is None else pk_set
+        for user_id in user_ids:
+            revoke_user_tokens(user_id)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_roles_on_group_change(sender, **kwargs):
+    """Un grupo renombrado o eliminado puede cambiar el rol de cualquier usuario."""
+    invalidate_all_roles()
+
+
+@receiver(pre_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def revoke_tokens_on_group_change(sender, instance, **kwargs):
+    """Los miembros de un grupo de rol renombrado o eliminado pierden ese rol."""
+    if instance.pk is None:
+        return
+    name = Group.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+    renamed_or_deleted = kwargs['signal'] is pre_delete or name != instance.name
+    if name in ROLE_GROUPS and renamed_or_deleted:
+        for user_id in instance.user_set.values_list('pk', flat=True):
+            revoke_user_tokens(user_id)
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_deactivation(sender, instance, created, **kwargs):
+    """Con autenticación sin estado, desactivar un usuario debe revocar sus tokens."""
+    if not created and not instance.is_active:
+        revoke_user_tokens(instance.pk)
+
+
+@receiver(pre_migrate)
+def create_shared_cache_tables(sender, using, **kwargs):
+    """
+    Con SHARED_CACHE_BACKEND=database las cachés compartidas (p. ej. la lista
+    de bloqueo) son tablas. Se crean antes de migrar: los grupos de rol que
+    crea users/admin.py tras migrar ya invalidan la caché 'roles'.
+    """
+    if sender.name == 'users':
+        call_command('createcachetable', database=using, verbosity=0)
@@ -0,0 +1,153 @@
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache, caches
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.request import Request
+from rest_framework_simplejwt.tokens import AccessToken
+from unittest import mock
+from .permissions import IsAdmin, get_request_role, get_user_role
+
+
+class RoleResolutionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_group, _ = Group.objects.get_or_create(name='Administrador')
+        cls.reader_group, _ = Group.objects.get_or_create(name='Lector')
+        cls.user = User.objects.create_user(username='lector', password='x')
+        cls.user.groups.add(cls.reader_group)
+
+    def setUp(self):
+        caches['roles'].clear()
+
+    def _fresh_user(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_role_is_cached_across_requests(self):
+        self.assertEqual(get_user_role(self._fresh_user()), 'reader')
+        user = self._fresh_user()
+        # Solo la lectura de la caché 'roles' (en la base de datos en las pruebas), sin los grupos
+        with self.assertNumQueries(1):
+            self.assertEqual(get_user_role(user), 'reader')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_role(user), 'reader')
+
+    def test_role_cache_is_shared_between_processes(self):
+        # Otro proceso no ve la caché local (locmem) de este; sí la caché 'roles'
+        self.assertEqual(get_user_role(self._fresh_user()), 'reader')
+        cache.clear()
+        self.user.groups.add(self.admin_group)
+        self.assertEqual(get_user_role(self._fresh_user()), 'admin')
+        self.assertEqual(caches['roles'].get(f'users:role:{self.user.pk}'), (0, 'admin'))
+
+    def test_membership_changes_invalidate_cache(self):
+        self.assertEqual(get_user_role(self._fresh_user()), 'reader')
+        self.user.groups.add(self.admin_group)
+        self.assertEqual(get_user_role(self._fresh_user()), 'admin')
+        self.admin_group.user_set.clear()
+        self.assertEqual(get_user_role(self._fresh_user()), 'reader')
+        self.reader_group.user_set.remove(self.user)
+        self.assertIsNone(get_user_role(self._fresh_user()))
+
+    def test_token_role_claim_skips_database(self):
+        token = AccessToken.for_user(self.user)
+        token['role'] = 'admin'
+        request = Request(RequestFactory().post('/'))
+        request._user, request._auth = self.user, token
+        with self.assertNumQueries(0):
+            self.assertEqual(get_request_role(request), 'admin')
+            self.assertTrue(IsAdmin().has_permission(request, None))
+
+
+def stateless_auth():
+    """Activa StatelessJWTAuthentication en las vistas usadas por las pruebas."""
+    from contextlib import ExitStack
+    from unittest import mock
+    from sedes.views import SedesViewSet
+    from .authentication import StatelessJWTAuthentication
+    from .views import CurrentUserView
+    stack = ExitStack()
+    for view in (SedesViewSet, CurrentUserView):
+        stack.enter_context(mock.patch.object(view, 'authentication_classes', [StatelessJWTAuthentication]))
+    return stack
+
+
+class TokenAuthenticationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        reader_group, _ = Group.objects.get_or_create(name='Lector')
+        cls.user = User.objects.create_user(username='lector', password='clave-segura')
+        cls.user.groups.add(reader_group)
+
+    def setUp(self):
+        cache.clear()
+        caches['reference'].clear()
+        res = self.client.post('/api/token/', {'username': 'lector', 'password': 'clave-segura'})
+        self.access, self.refresh = res.data['access'], res.data['refresh']
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {self.access}'}
+
+    # Como con SHARED_CACHE_BACKEND=redis: la lista de bloqueo no está en la base de datos
+    @override_settings(CACHES={**settings.CACHES, 'tokens': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_stateless_authentication_skips_user_query(self):
+        with stateless_auth():
+            # Solo el listado de sedes
+            with self.assertNumQueries(1):
+                res = self.client.get('/api/sedes/', **self.auth)
+            self.assertEqual(res.status_code, 200)
+            # Un lector no puede escribir aunque no se consulten sus grupos
+            with self.assertNumQueries(0):
+                res = self.client.post('/api/sedes/', {'name': 'Nueva'}, **self.auth)
+            self.assertEqual(res.status_code, 403)
+            res = self.client.get('/api/users/me/', **self.auth)
+            self.assertEqual((res.data['username'], res.data['role']), ('lector', 'reader'))
+
+    def test_revoked_tokens_are_rejected(self):
+        res = self.client.post('/api/token/revoke/', {'refresh': self.refresh}, **self.auth)
+        self.assertEqual(res.status_code, 204)
+        self.assertEqual(self.client.get('/api/sedes/', **self.auth).status_code, 401)
+        self.assertEqual(self.client.post('/api/token/refresh/', {'refresh': self.refresh}).status_code, 401)
+
+    def test_revocations_are_shared_between_processes(self):
+        # Otro proceso no ve la caché local (locmem) de este; sí la caché 'tokens'
+        self.client.post('/api/token/revoke/', {'refresh': self.refresh}, **self.auth)
+        cache.clear()
+        self.assertEqual(self.client.get('/api/sedes/', **self.auth).status_code, 401)
+
+    def test_deactivating_user_revokes_tokens(self):
+        self.user.is_active = False
+        self.user.save()
+        with stateless_auth():
+            self.assertEqual(self.client.get('/api/sedes/', **self.auth).status_code, 401)
+
+
+class RoleChangeTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_group, _ = Group.objects.get_or_create(name='Administrador')
+        cls.reader_group, _ = Group.objects.get_or_create(name='Lector')
+        cls.user = User.objects.create_user(username='admin', password='clave-segura')
+        cls.user.groups.add(cls.admin_group, cls.reader_group)
+
+    def setUp(self):
+        cache.clear()
+        res = self.client.post('/api/token/', {'username': 'admin', 'password': 'clave-segura'})
+        self.access, self.refresh = res.data['access'], res.data['refresh']
+
+    def _create_sede(self, access):
+        return self.client.post('/api/sedes/', {'name': 'Nueva'}, HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_demotion_revokes_tokens(self):
+        self.assertEqual(self._create_sede(self.access).status_code, 201)
+        self.user.groups.remove(self.admin_group)
+        self.assertEqual(self._create_sede(self.access).status_code, 401)
+        self.assertEqual(self.client.post('/api/token/refresh/', {'refresh': self.refresh}).status_code, 401)
+
+    def test_refresh_resolves_current_role(self):
+        # Aun sin revocación, el access renovado lleva el rol actual y no el del login
+        with mock.patch('users.signals.revoke_user_tokens'):
+            self.user.groups.remove(self.admin_group)
+        res = self.client.post('/api/token/refresh/', {'refresh': self.refresh})
+        self.assertEqual(AccessToken(res.data['access'])['role'], 'reader')
+        self.assertEqual(self._create_sede(res.data['access']).status_code, 403)
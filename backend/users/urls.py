@@ -2,13 +2,17 @@ from django.urls import path
 from .views import (
     CurrentUserView,
     UserRegistrationView,
-    CustomTokenObtainPairView
+    CustomTokenObtainPairView,
+    CustomTokenRefreshView,
+    TokenRevokeView
 )
 
 urlpatterns = [
     path('users/me/', CurrentUserView.as_view(), name='current-user'),
     path('users/register/', UserRegistrationView.as_view(), name='user-register'),
     path('token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('token/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
+    path('token/revoke/', TokenRevokeView.as_view(), name='token_revoke'),
 ]
 
 
@@ -3,12 +3,17 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth.models import User
+from .authentication import revoke_token
 from .serializers import (
     UserSerializer,
     UserRegistrationSerializer,
-    CustomTokenObtainPairSerializer
+    CustomTokenObtainPairSerializer,
+    CustomTokenRefreshSerializer
 )
 from .permissions import IsAdmin
 
@@ -18,13 +23,38 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
 
+class CustomTokenRefreshView(TokenRefreshView):
+    """Renovación de token que respeta la lista de bloqueo"""
+    serializer_class = CustomTokenRefreshSerializer
+
+
+class TokenRevokeView(APIView):
+    """Vista para cerrar sesión: revoca el access token actual y, si se envía, el refresh"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if request.auth is not None:
+            revoke_token(request.auth)
+        refresh = request.data.get('refresh')
+        if refresh:
+            try:
+                revoke_token(RefreshToken(refresh))
+            except TokenError:
+                return Response({'error': 'Refresh token inválido'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class CurrentUserView(APIView):
     """Vista para obtener información del usuario actual"""
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
         """Retornar información del usuario actual con su rol"""
-        serializer = UserSerializer(request.user)
+        user = request.user
+        if isinstance(user, TokenUser):
+            # Con autenticación sin estado solo se tienen los claims del token
+            user = User.objects.get(pk=user.id)
+        serializer = UserSerializer(user)
         return Response(serializer.data)
 
 